@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Benchmark the generator over synthetic date windows
+Measures create_daily_page, the index pages, the RSS feed and a full build
+at growing window sizes and emits a JSON report that can be diffed between
+commits
+"""
+
+from datetime import date as Date, timedelta
+import argparse
+import contextlib
+import json
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import generate_feed
+
+TARGETS = ['daily', 'index', 'feed', 'build']
+WINDOWS = [30, 365, 3650, 36500]
+BASE_URL = 'https://example.github.io/rockandminotd'
+
+# Fixed so that every run renders the same synthetic window
+WINDOW_END = Date(2026, 1, 1)
+
+def synthetic_window(days):
+    """(date, rock, mineral) tuples for `days` days ending at WINDOW_END, newest first"""
+    return [(day,) + generate_feed.get_specimens_for_date(day)
+            for day in generate_feed.date_range(WINDOW_END - timedelta(days=days - 1), WINDOW_END)]
+
+def directory_size(path):
+    """Total size in bytes of all files below path"""
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            total += os.path.getsize(os.path.join(root, name))
+    return total
+
+def run_target(target, items, out_dir):
+    """Run one benchmark target and return the number of bytes it produced"""
+    if target == 'daily':
+        total = 0
+        for day, rock, mineral in items:
+            total += len(generate_feed.create_daily_page(day, rock, mineral, BASE_URL).encode('utf-8'))
+        return total
+    if target == 'index':
+        return sum(len(html.encode('utf-8')) for _, html in generate_feed.generate_index_pages(items, BASE_URL))
+    if target == 'feed':
+        path = os.path.join(out_dir, 'feed.xml')
+        with open(path, 'w', encoding='utf-8') as f:
+            generate_feed.write_rss_feed(f, items, BASE_URL)
+        return os.path.getsize(path)
+    if target == 'build':
+        # The build records the window as published history, so it runs
+        # against a scratch copy of schedule.json with today at WINDOW_END
+        with tempfile.TemporaryDirectory() as schedule_dir:
+            schedule_path = generate_feed.SCHEDULE_PATH
+            generate_feed.SCHEDULE_PATH = os.path.join(schedule_dir, 'schedule.json')
+            shutil.copyfile(schedule_path, generate_feed.SCHEDULE_PATH)
+            generate_feed.load_schedule_eras.cache_clear()
+            try:
+                with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+                    generate_feed.build(BASE_URL, out_dir=out_dir, dates=[day for day, _, _ in items],
+                                        current=WINDOW_END)
+            finally:
+                generate_feed.SCHEDULE_PATH = schedule_path
+                generate_feed.load_schedule_eras.cache_clear()
+        return directory_size(out_dir)
+    raise ValueError(f'unknown target {target!r}')
+
+def measure(target, days):
+    """Measure one target/window pair in this process
+
+    The timed run is untraced; a second run under tracemalloc provides the
+    allocation figures, since tracing slows allocation-heavy code down.
+    """
+    items = synthetic_window(days)
+
+    with tempfile.TemporaryDirectory() as out_dir:
+        blocks_before = sys.getallocatedblocks()
+        start = time.perf_counter()
+        bytes_written = run_target(target, items, out_dir)
+        wall = time.perf_counter() - start
+        peak_rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        blocks_after = sys.getallocatedblocks()
+
+    with tempfile.TemporaryDirectory() as out_dir:
+        tracemalloc.start()
+        run_target(target, items, out_dir)
+        _, alloc_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    return {
+        'target': target,
+        'window': days,
+        'wall_s': round(wall, 6),
+        'peak_rss_kb': peak_rss_kb,
+        'alloc_peak_bytes': alloc_peak,
+        'retained_blocks': blocks_after - blocks_before,
+        'bytes_written': bytes_written,
+    }
+
+def measure_in_subprocess(target, days):
+    """Measure in a fresh interpreter so peak RSS belongs to this pair alone"""
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--worker', target, str(days)],
+        check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(output)
+
+def git_commit():
+    """Current commit hash, or None outside a git checkout"""
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], check=True, capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def print_table(results, baseline=None):
+    """Human-readable summary, with time ratios against a baseline report if given"""
+    previous = {}
+    if baseline:
+        previous = {(r['target'], r['window']): r for r in baseline['results']}
+    print(f"{'target':<8}{'window':>8}{'wall s':>11}{'peak RSS MB':>13}{'alloc peak MB':>15}{'written MB':>12}{'vs base':>9}",
+          file=sys.stderr)
+    for r in results:
+        ratio = ''
+        before = previous.get((r['target'], r['window']))
+        if before and before['wall_s']:
+            ratio = f"{r['wall_s'] / before['wall_s']:.2f}x"
+        print(f"{r['target']:<8}{r['window']:>8}{r['wall_s']:>11.4f}{r['peak_rss_kb'] / 1024:>13.1f}"
+              f"{r['alloc_peak_bytes'] / 2**20:>15.1f}{r['bytes_written'] / 2**20:>12.1f}{ratio:>9}",
+              file=sys.stderr)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark page, index, feed and full-build generation')
+    parser.add_argument('--targets', default=','.join(TARGETS),
+                        help='comma-separated targets to run (default: %(default)s)')
+    parser.add_argument('--windows', default=','.join(map(str, WINDOWS)),
+                        help='comma-separated window sizes in days (default: %(default)s)')
+    parser.add_argument('--output', help='write the JSON report here instead of stdout')
+    parser.add_argument('--compare', metavar='REPORT', help='previous JSON report to compare wall times against')
+    parser.add_argument('--worker', nargs=2, metavar=('TARGET', 'DAYS'), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        target, days = args.worker
+        json.dump(measure(target, int(days)), sys.stdout)
+        return
+
+    targets = args.targets.split(',')
+    unknown = set(targets) - set(TARGETS)
+    if unknown:
+        parser.error(f"unknown targets: {', '.join(sorted(unknown))}")
+    windows = [int(w) for w in args.windows.split(',')]
+
+    results = []
+    for target in targets:
+        for days in windows:
+            print(f'{target} x {days} days...', file=sys.stderr)
+            results.append(measure_in_subprocess(target, days))
+
+    report = {
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': results,
+    }
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+    print_table(results, baseline)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+            f.write('\n')
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+if __name__ == '__main__':
+    main()
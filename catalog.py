@@ -0,0 +1,115 @@
+"""
+Specimen catalog loaded lazily from specimens.jsonl
+Each line holds one rock or mineral: name, category, tags and the curated
+description used as a fallback for Wikipedia content
+"""
+
+import functools
+import json
+import os
+import sys
+
+CATALOG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'specimens.jsonl')
+CATEGORIES = ('rock', 'mineral')
+
+class Specimen:
+    """One catalog entry
+
+    Supports specimen['name']-style access as well as attributes, so the
+    page and feed code can treat it like the dicts the catalog used to be.
+    """
+
+    __slots__ = ('name', 'category', 'tags', 'desc', 'index')
+
+    def __init__(self, name, category, tags, desc, index):
+        self.name = name
+        self.category = category
+        self.tags = tags
+        self.desc = desc
+        self.index = index
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except (AttributeError, TypeError):
+            raise KeyError(key) from None
+
+    def __getstate__(self):
+        return (self.name, self.category, self.tags, self.desc, self.index)
+
+    def __setstate__(self, state):
+        self.name, self.category, self.tags, self.desc, self.index = state
+
+    def __repr__(self):
+        return f'Specimen({self.name!r}, {self.category!r})'
+
+class Catalog:
+    """Specimens in file order with name, category and tag indexes
+
+    index is the position of a specimen within its category, which is what
+    the rotation schedule refers to.
+    """
+
+    __slots__ = ('specimens', 'by_name', 'by_category', 'by_tag')
+
+    def __init__(self, specimens):
+        self.specimens = tuple(specimens)
+        self.by_name = {}
+        self.by_category = {category: [] for category in CATEGORIES}
+        self.by_tag = {}
+        for specimen in self.specimens:
+            key = specimen.name.casefold()
+            if key in self.by_name:
+                raise ValueError(f'duplicate specimen {specimen.name!r} in catalog')
+            self.by_name[key] = specimen
+            self.by_category[specimen.category].append(specimen)
+            for tag in specimen.tags:
+                self.by_tag.setdefault(tag, []).append(specimen)
+
+    @property
+    def rocks(self):
+        return self.by_category['rock']
+
+    @property
+    def minerals(self):
+        return self.by_category['mineral']
+
+    def get(self, name):
+        """Look a specimen up by name, ignoring case; None if absent"""
+        return self.by_name.get(name.casefold())
+
+    def with_tag(self, tag):
+        """All specimens carrying a tag, in catalog order"""
+        return self.by_tag.get(tag, [])
+
+def parse_catalog(lines, source='<catalog>'):
+    """Build a Catalog from JSON Lines text, interning repeated strings"""
+    counts = dict.fromkeys(CATEGORIES, 0)
+    specimens = []
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            entry = json.loads(line)
+            category = entry['category']
+            if category not in counts:
+                raise ValueError(f'unknown category {category!r}')
+            specimen = Specimen(
+                sys.intern(entry['name']),
+                sys.intern(category),
+                tuple(sys.intern(tag) for tag in entry.get('tags', ())),
+                sys.intern(entry['desc']),
+                counts[category],
+            )
+        except (KeyError, ValueError) as err:
+            raise ValueError(f'{source}:{number}: invalid catalog entry: {err}') from None
+        counts[category] += 1
+        specimens.append(specimen)
+    return Catalog(specimens)
+
+@functools.lru_cache(maxsize=None)
+def load_catalog(path=CATALOG_PATH):
+    """Read the catalog on first use; later calls return the same object"""
+    with open(path, encoding='utf-8') as f:
+        return parse_catalog(f, path)
@@ -0,0 +1,134 @@
+"""
+Streaming writers for the RSS 2.0, Atom and JSON Feed 1.1 formats
+Each writer emits its header when created, one entry per item() call and
+the footer on close(), so several feeds can be filled from a single pass
+"""
+
+import json
+
+from templating import escape_xml, escape_xml_attr
+
+# RFC 5005 feed history extension (fh:archive, fh:complete)
+HISTORY_NS = 'http://purl.org/syndication/history/1.0'
+JSON_FEED_VERSION = 'https://jsonfeed.org/version/1.1'
+
+def rfc822(moment):
+    """Format a UTC datetime for RSS, e.g. Sun, 15 Feb 2026 06:00:00 +0000"""
+    return moment.strftime('%a, %d %b %Y %H:%M:%S +0000')
+
+def rfc3339(moment):
+    """Format a UTC datetime for Atom and JSON Feed, e.g. 2026-02-15T06:00:00Z"""
+    return moment.strftime('%Y-%m-%dT%H:%M:%SZ')
+
+class RssWriter:
+    """RSS 2.0 channel; history is None, 'archive' or 'complete' (RFC 5005)
+
+    links are extra (rel, href) pairs such as prev-archive or current,
+    written as atom:link elements. updated is the newest item's date, so
+    that lastBuildDate only changes when the items do.
+    """
+
+    def __init__(self, out, meta, updated=None, links=(), history=None):
+        self.write = out.write
+        namespaces = 'xmlns:atom="http://www.w3.org/2005/Atom"'
+        if history:
+            namespaces += f' xmlns:fh="{HISTORY_NS}"'
+        self.write('<?xml version="1.0" ?>\n')
+        self.write(f'<rss {namespaces} version="2.0">\n')
+        self.write('  <channel>\n')
+        self.element('    ', 'title', meta['title'])
+        self.element('    ', 'link', meta['link'])
+        self.element('    ', 'description', meta['description'])
+        self.element('    ', 'language', meta['language'])
+        if updated is not None:
+            self.element('    ', 'lastBuildDate', rfc822(updated))
+        self.write(f'    <atom:link href="{escape_xml_attr(meta["self_url"])}" rel="self" type="application/rss+xml"/>\n')
+        for rel, href in links:
+            self.write(f'    <atom:link href="{escape_xml_attr(href)}" rel="{rel}" type="application/rss+xml"/>\n')
+        if history:
+            self.write(f'    <fh:{history}/>\n')
+
+    def element(self, indent, tag, text):
+        self.write(f'{indent}<{tag}>{escape_xml(text)}</{tag}>\n')
+
+    def item(self, item):
+        self.write('    <item>\n')
+        self.element('      ', 'title', item['title'])
+        self.element('      ', 'link', item['url'])
+        self.element('      ', 'description', item['description'])
+        self.write(f'      <guid isPermaLink="true">{escape_xml(item["url"])}</guid>\n')
+        self.element('      ', 'pubDate', rfc822(item['published']))
+        self.write('    </item>\n')
+
+    def close(self):
+        self.write('  </channel>\n')
+        self.write('</rss>\n')
+
+class AtomWriter:
+    """Atom 1.0 feed with the same entries as the RSS channel"""
+
+    def __init__(self, out, meta, updated=None, links=()):
+        self.write = out.write
+        self.write('<?xml version="1.0" encoding="utf-8"?>\n')
+        self.write('<feed xmlns="http://www.w3.org/2005/Atom">\n')
+        self.element('  ', 'title', meta['title'])
+        self.element('  ', 'subtitle', meta['description'])
+        self.write(f'  <link href="{escape_xml_attr(meta["link"])}/" rel="alternate" type="text/html"/>\n')
+        self.write(f'  <link href="{escape_xml_attr(meta["self_url"])}" rel="self" type="application/atom+xml"/>\n')
+        for rel, href in links:
+            self.write(f'  <link href="{escape_xml_attr(href)}" rel="{rel}"/>\n')
+        self.element('  ', 'id', f'{meta["link"]}/')
+        if updated is not None:
+            self.element('  ', 'updated', rfc3339(updated))
+        self.write('  <author>\n')
+        self.element('    ', 'name', meta['title'])
+        self.write('  </author>\n')
+
+    def element(self, indent, tag, text):
+        self.write(f'{indent}<{tag}>{escape_xml(text)}</{tag}>\n')
+
+    def item(self, item):
+        self.write('  <entry>\n')
+        self.element('    ', 'title', item['title'])
+        self.write(f'    <link href="{escape_xml_attr(item["url"])}" rel="alternate" type="text/html"/>\n')
+        self.element('    ', 'id', item['url'])
+        self.element('    ', 'published', rfc3339(item['published']))
+        self.element('    ', 'updated', rfc3339(item['published']))
+        self.write(f'    <content type="html">{escape_xml(item["description"])}</content>\n')
+        self.write('  </entry>\n')
+
+    def close(self):
+        self.write('</feed>\n')
+
+class JsonFeedWriter:
+    """JSON Feed 1.1 document, streamed item by item"""
+
+    def __init__(self, out, meta, updated=None):
+        self.write = out.write
+        header = {
+            'version': JSON_FEED_VERSION,
+            'title': meta['title'],
+            'home_page_url': f'{meta["link"]}/',
+            'feed_url': meta['self_url'],
+            'description': meta['description'],
+            'language': meta['language'],
+        }
+        self.write('{\n')
+        for key, value in header.items():
+            self.write(f'  {json.dumps(key)}: {json.dumps(value, ensure_ascii=False)},\n')
+        self.write('  "items": [')
+        self.separator = '\n'
+
+    def item(self, item):
+        entry = {
+            'id': item['url'],
+            'url': item['url'],
+            'title': item['title'],
+            'content_html': item['description'],
+            'date_published': rfc3339(item['published']),
+        }
+        self.write(f'{self.separator}    {json.dumps(entry, ensure_ascii=False)}')
+        self.separator = ',\n'
+
+    def close(self):
+        self.write('\n  ]\n}\n' if self.separator != '\n' else ']\n}\n')
@@ -4,452 +4,1172 @@ Generate Rock & Mineral of the Day pages and RSS feed
 Creates individual HTML pages for each day plus a homepage index
 """
 
-from datetime import datetime, timedelta
-import xml.etree.ElementTree as ET
-from xml.dom import minidom
+from array import array
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import date as Date, datetime, time as Time, timedelta, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+import argparse
+import bisect
+import filecmp
+import functools
+import hashlib
+import io
+import json
+import mmap
 import os
+import random
+import re
+import struct
+import sys
 
-# Curated lists of rocks and minerals
-rocks = [
-    {"name": "Granite", "desc": "A coarse-grained intrusive igneous rock composed mainly of quartz, feldspar, and mica. Widely used as a construction and decorative stone."},
-    {"name": "Basalt", "desc": "A dark, fine-grained volcanic rock that makes up most of the ocean floor. Forms from rapidly cooled lava."},
-    {"name": "Sandstone", "desc": "A sedimentary rock composed mainly of sand-sized mineral particles or rock fragments."},
-    {"name": "Limestone", "desc": "A sedimentary rock composed largely of calcite. Forms from marine organisms and chemical precipitation."},
-    {"name": "Marble", "desc": "A metamorphic rock formed from limestone under heat and pressure. Prized for sculpture and architecture."},
-    {"name": "Slate", "desc": "A fine-grained metamorphic rock that splits into thin sheets. Used for roofing and flooring."},
-    {"name": "Schist", "desc": "A medium-grade metamorphic rock with visible mineral grains aligned in parallel layers."},
-    {"name": "Gneiss", "desc": "A high-grade metamorphic rock with alternating light and dark bands. Very hard and durable."},
-    {"name": "Obsidian", "desc": "Volcanic glass formed from rapidly cooled lava. Sharp edges made it valuable for tools and weapons."},
-    {"name": "Pumice", "desc": "A vesicular volcanic rock so full of gas bubbles that it can float on water."},
-    {"name": "Andesite", "desc": "An intermediate volcanic rock named after the Andes Mountains where it's common."},
-    {"name": "Rhyolite", "desc": "A fine-grained volcanic rock with high silica content. The volcanic equivalent of granite."},
-    {"name": "Shale", "desc": "A fine-grained sedimentary rock formed from clay and silt. The most common sedimentary rock."},
-    {"name": "Conglomerate", "desc": "A sedimentary rock composed of rounded pebbles and cobbles cemented together."},
-    {"name": "Breccia", "desc": "Similar to conglomerate but composed of angular rock fragments cemented together."},
-    {"name": "Diorite", "desc": "An intrusive igneous rock intermediate in composition between granite and gabbro."},
-    {"name": "Gabbro", "desc": "A coarse-grained intrusive igneous rock, the plutonic equivalent of basalt."},
-    {"name": "Peridotite", "desc": "A dense, coarse-grained igneous rock composed mainly of olivine and pyroxene."},
-    {"name": "Dunite", "desc": "An ultramafic rock composed almost entirely of olivine."},
-    {"name": "Tuff", "desc": "A rock formed from consolidated volcanic ash."},
-    {"name": "Mudstone", "desc": "A fine-grained sedimentary rock composed of clay and silt particles."},
-    {"name": "Siltstone", "desc": "A sedimentary rock composed mainly of silt-sized particles."},
-    {"name": "Quartzite", "desc": "A hard metamorphic rock formed from sandstone. Very resistant to weathering."},
-    {"name": "Anthracite", "desc": "The highest grade of coal. Very hard and has the highest carbon content."},
-    {"name": "Bituminous coal", "desc": "A relatively soft coal containing a tar-like substance called bitumen. The most abundant type of coal."},
-    {"name": "Lignite", "desc": "A soft brownish coal showing traces of plant structure. The lowest grade of coal."},
-    {"name": "Dolomite rock", "desc": "A sedimentary carbonate rock composed primarily of the mineral dolomite."},
-    {"name": "Chert", "desc": "A hard, fine-grained sedimentary rock composed of microcrystalline quartz."},
-    {"name": "Phyllite", "desc": "A metamorphic rock intermediate between slate and schist with a silky sheen."},
-    {"name": "Migmatite", "desc": "A high-grade metamorphic rock showing both igneous and metamorphic characteristics."}
-]
-
-minerals = [
-    {"name": "Quartz", "desc": "One of the most abundant minerals in Earth's crust. Composed of silicon and oxygen, it's very hard and comes in many varieties."},
-    {"name": "Feldspar", "desc": "The most abundant mineral group in Earth's crust, comprising about 60% of terrestrial rocks."},
-    {"name": "Calcite", "desc": "A carbonate mineral and the main component of limestone and marble. Reacts with dilute acid."},
-    {"name": "Gypsum", "desc": "A soft sulfate mineral used to make plaster of Paris and drywall. Can form large transparent crystals."},
-    {"name": "Halite", "desc": "Rock salt. Forms from evaporation of seawater. Essential for human life and historically valuable for trade."},
-    {"name": "Pyrite", "desc": "Known as 'fool's gold' for its metallic luster and pale brass-yellow color. An iron sulfide mineral."},
-    {"name": "Magnetite", "desc": "A black magnetic iron oxide. The most magnetic of all naturally occurring minerals on Earth."},
-    {"name": "Hematite", "desc": "The main ore of iron. Named from the Greek word for blood due to its red color when powdered."},
-    {"name": "Garnet", "desc": "A group of silicate minerals used as gemstones and abrasives. Commonly deep red but can be many colors."},
-    {"name": "Olivine", "desc": "A green silicate mineral common in Earth's mantle. The gem variety is called peridot."},
-    {"name": "Mica", "desc": "A group of silicate minerals known for their perfect sheet-like cleavage and flexibility."},
-    {"name": "Talc", "desc": "The softest mineral (hardness 1 on Mohs scale). Used in cosmetics and as a lubricant."},
-    {"name": "Fluorite", "desc": "A colorful halide mineral that fluoresces under UV light. Used in optics and metallurgy."},
-    {"name": "Apatite", "desc": "A group of phosphate minerals. The main component of tooth enamel and bones."},
-    {"name": "Orthoclase", "desc": "A common potassium feldspar mineral. An important component of granite."},
-    {"name": "Plagioclase", "desc": "A series of sodium-calcium feldspar minerals. Very common in igneous rocks."},
-    {"name": "Hornblende", "desc": "A dark amphibole mineral common in igneous and metamorphic rocks."},
-    {"name": "Augite", "desc": "A black or dark green pyroxene mineral common in basalt and gabbro."},
-    {"name": "Serpentine", "desc": "A group of green minerals formed by alteration of olivine and pyroxene. Often used as decorative stone."},
-    {"name": "Kaolinite", "desc": "A white clay mineral used in ceramics and paper manufacturing."},
-    {"name": "Chalcopyrite", "desc": "The most abundant copper ore mineral. Has a brass-yellow color."},
-    {"name": "Galena", "desc": "The primary ore of lead. Forms cubic crystals with perfect cleavage."},
-    {"name": "Sphalerite", "desc": "The primary ore of zinc. Can be various colors but often brown or black."},
-    {"name": "Barite", "desc": "A heavy sulfate mineral used in drilling mud and as a source of barium."},
-    {"name": "Graphite", "desc": "A soft form of carbon used in pencils and lubricants. The most stable form of carbon under standard conditions."},
-    {"name": "Diamond", "desc": "The hardest natural substance. A form of carbon crystallized under extreme pressure and temperature."},
-    {"name": "Corundum", "desc": "The second hardest mineral after diamond. Includes ruby and sapphire varieties."},
-    {"name": "Beryl", "desc": "A beryllium silicate mineral. Gem varieties include emerald and aquamarine."},
-    {"name": "Topaz", "desc": "A hard silicate mineral often used as a gemstone. Can be many colors."},
-    {"name": "Tourmaline", "desc": "A complex boron silicate mineral that comes in many colors. Often used as a gemstone."},
-    {"name": "Zircon", "desc": "A zirconium silicate mineral used in geochronology and as a gemstone."},
-    {"name": "Amphibole", "desc": "A group of dark silicate minerals important in igneous and metamorphic rocks."},
-    {"name": "Chlorite", "desc": "A green sheet silicate mineral common in low-grade metamorphic rocks."},
-    {"name": "Epidote", "desc": "A green calcium aluminum silicate mineral common in metamorphic rocks."},
-    {"name": "Dolomite", "desc": "A carbonate mineral similar to limestone but contains magnesium. Used as a source of magnesia."}
-]
-
-def get_day_of_year(date):
-    """Calculate day of year (1-366) for a given date"""
-    start = datetime(date.year, 1, 1)
-    return (date - start).days + 1
+from catalog import CATALOG_PATH, load_catalog
+from feeds import AtomWriter, JsonFeedWriter, RssWriter
+from images import CACHE_DIR as IMAGE_CACHE_DIR, ImagePipeline
+from instrument import BuildReport
+from search import generate_search_index
+from templating import Template, escape_html, load_template, templates_fingerprint
+import publish
+import wiki_fetch
+
+# Changes whenever a template under templates/ changes, so that incremental
+# builds know to regenerate pages whose inputs are otherwise equal
+TEMPLATE_VERSION = templates_fingerprint()
+
+# The specimen rotation is anchored at this date and shuffled with this seed;
+# changing either reshuffles which pair is featured on every day
+SCHEDULE_EPOCH = Date(2026, 1, 1)
+SCHEDULE_SEED = 1050
+
+# Pins the rotation of published dates. Each era fixes how many rocks and
+# minerals (the first ones in specimens.jsonl) the schedule draws from,
+# starting on its date; specimens appended to the catalog join the rotation
+# in a new era that begins after the last published date. Dates published
+# before the shuffled schedule existed keep the day-of-year rotation
+SCHEDULE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'schedule.json')
+DAY_OF_YEAR = 'day-of-year'
+SHUFFLED = 'shuffled'
+
+# Precompiled stylesheet and search script shared by the static pages,
+# published under content-hashed names so that they can be cached forever
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+STYLESHEET_NAME = 'style.css'
+SEARCH_SCRIPT_NAME = 'search.js'
+ASSET_NAMES = (STYLESHEET_NAME, SEARCH_SCRIPT_NAME)
+
+# Days built when no --start is given, and when each day's post goes out in
+# the publish timezone (matching the scheduled workflow at 06:00 UTC)
+DEFAULT_WINDOW = 30
+PUBLISH_TIME = Time(6)
+
+# Generated files that --expired prune may delete when a build no longer
+# produces them: daily pages in the output root and everything under these
+# directories, with their .gz/.br siblings. assets/ is left alone, since
+# daily pages that are not re-rendered still link to older hashed assets
+DAILY_PAGE_NAME = re.compile(r'\d{4}-\d{2}-\d{2}\.html')
+PRUNED_DIRS = ('page', 'archive', 'feeds', 'search')
+
+# Number of posts listed on each page of the paginated index
+INDEX_PAGE_SIZE = 30
+
+# Feeds list at least this many of the newest posts (and all posts of the
+# newest month); older months are published as RFC 5005 archive feeds
+FEED_SIZE = 30
+COMPLETE_FEED_NAME = 'feeds/all.xml'
+FEED_META = {
+    'title': 'Rock & Mineral of the Day',
+    'description': 'Daily geology education featuring a different rock and mineral each day from Wikipedia',
+    'language': 'en-us',
+}
+
+# Records a content hash and the inputs of every output from the last build
+MANIFEST_NAME = '.build-manifest.json'
+
+@functools.lru_cache(maxsize=None)
+def asset_path(name):
+    """Content-hashed output path of a file from static/, e.g. assets/style.<hash>.css"""
+    with open(os.path.join(STATIC_DIR, name), 'rb') as f:
+        return publish.hashed_asset_name(name, f.read())
+
+def __getattr__(name):
+    """Expose the catalog's rocks and minerals lists, loading it on first access"""
+    if name in ('rocks', 'minerals'):
+        return getattr(load_catalog(), name)
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+class Schedule:
+    """Precomputed rotation through every rock × mineral pairing
+
+    The cycle has one slot per pair, so all len(rocks) * len(minerals)
+    combinations are featured once before any repeats. Slot n = b * R + i
+    (R rocks, M minerals) holds rock rock_order[i] and mineral
+    mineral_order[(i + b) % M], where both orders are shuffles seeded by
+    seed. This visits every pair exactly once, features each rock every R
+    days and never shows the same rock on consecutive days.
+
+    The table is a flat array of interleaved (rock, mineral) uint16 indexes,
+    which save() writes after a small header and load() memory-maps, so a
+    lookup by date ordinal is a single array read. For each specimen the
+    sorted slots it appears in are also kept, to find its next appearance.
+    """
+
+    MAGIC = b'RMSC'
+    HEADER = struct.Struct('<4sHHqq')
+
+    def __init__(self, n_rocks, n_minerals, seed=SCHEDULE_SEED, table=None, epoch=SCHEDULE_EPOCH):
+        self.n_rocks = n_rocks
+        self.n_minerals = n_minerals
+        self.seed = seed
+        self.epoch = epoch
+        self.cycle = n_rocks * n_minerals
+
+        if table is None:
+            rng = random.Random(seed)
+            rock_order = list(range(n_rocks))
+            mineral_order = list(range(n_minerals))
+            rng.shuffle(rock_order)
+            rng.shuffle(mineral_order)
+            table = array('H')
+            for block in range(n_minerals):
+                for i in range(n_rocks):
+                    table.append(rock_order[i])
+                    table.append(mineral_order[(i + block) % n_minerals])
+        self.table = table
+
+        self.rock_slots = [array('I') for _ in range(n_rocks)]
+        self.mineral_slots = [array('I') for _ in range(n_minerals)]
+        for slot in range(self.cycle):
+            self.rock_slots[table[2 * slot]].append(slot)
+            self.mineral_slots[table[2 * slot + 1]].append(slot)
+
+    def slot(self, date):
+        """Position of a date within the cycle"""
+        return (date.toordinal() - self.epoch.toordinal()) % self.cycle
+
+    def indexes_for_date(self, date):
+        """Return (rock_index, mineral_index) featured on a date"""
+        slot = self.slot(date)
+        return self.table[2 * slot], self.table[2 * slot + 1]
+
+    def next_featured(self, kind, index, after):
+        """First date strictly after `after` that features rocks[index] or minerals[index]
+
+        kind is 'rock' or 'mineral'.
+        """
+        slots = self.rock_slots[index] if kind == 'rock' else self.mineral_slots[index]
+        current = self.slot(after)
+        position = bisect.bisect_right(slots, current)
+        if position < len(slots):
+            days_ahead = slots[position] - current
+        else:
+            days_ahead = self.cycle - current + slots[0]
+        return after + timedelta(days=days_ahead)
+
+    def save(self, path):
+        """Write the table in the binary layout load() maps back in"""
+        with open(path, 'wb') as f:
+            f.write(self.HEADER.pack(self.MAGIC, self.n_rocks, self.n_minerals, self.seed, self.epoch.toordinal()))
+            f.write(self.table.tobytes())
+
+    @classmethod
+    def load(cls, path):
+        """Memory-map a table written by save()"""
+        with open(path, 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, n_rocks, n_minerals, seed, epoch = cls.HEADER.unpack_from(mapped)
+        if magic != cls.MAGIC:
+            raise ValueError(f'{path} is not a schedule table')
+        table = memoryview(mapped)[cls.HEADER.size:].cast('H')
+        if len(table) != 2 * n_rocks * n_minerals:
+            raise ValueError(f'{path} is truncated')
+        return cls(n_rocks, n_minerals, seed, table, Date.fromordinal(epoch))
+
+class DayOfYearRotation:
+    """The original rotation: rocks[day % R] and minerals[day % M], day being the day of the year (1-366)
+
+    Kept for the dates published with it, so that their pages, feed items
+    and listings keep featuring the same pair.
+    """
+
+    def __init__(self, n_rocks, n_minerals):
+        self.n_rocks = n_rocks
+        self.n_minerals = n_minerals
+
+    def indexes_for_date(self, date):
+        """Return (rock_index, mineral_index) featured on a date"""
+        day = date.timetuple().tm_yday
+        return day % self.n_rocks, day % self.n_minerals
+
+    def next_featured(self, kind, index, after):
+        """First date strictly after `after` that features rocks[index] or minerals[index]"""
+        position = 0 if kind == 'rock' else 1
+        date = after + timedelta(days=1)
+        # Every index comes up within a year, since R and M are below 365
+        while self.indexes_for_date(date)[position] != index:
+            date += timedelta(days=1)
+        return date
+
+@functools.lru_cache(maxsize=None)
+def get_schedule(n_rocks, n_minerals, seed=SCHEDULE_SEED, epoch=SCHEDULE_EPOCH):
+    """Build (once) the schedule for catalogs of the given sizes"""
+    return Schedule(n_rocks, n_minerals, seed, epoch=epoch)
+
+@functools.lru_cache(maxsize=None)
+def load_schedule_eras(path=None):
+    """((start, n_rocks, n_minerals, rotation), ...) from schedule.json, oldest first
+
+    rotation is SHUFFLED (the default) or DAY_OF_YEAR. The first era also
+    covers every date before it. Without the file, a single shuffled era
+    covers the whole catalog from SCHEDULE_EPOCH. Here and below, path
+    defaults to SCHEDULE_PATH as it is when called, so that a scratch copy
+    can stand in for it (see bench.py).
+    """
+    try:
+        with open(path or SCHEDULE_PATH, encoding='utf-8') as f:
+            eras = json.load(f)['eras']
+    except FileNotFoundError:
+        catalog = load_catalog()
+        return ((SCHEDULE_EPOCH, len(catalog.rocks), len(catalog.minerals), SHUFFLED),)
+    return tuple((Date.fromisoformat(era['from']), era['rocks'], era['minerals'], era.get('rotation', SHUFFLED))
+                 for era in eras)
+
+def save_schedule_eras(eras, path=None):
+    """Write eras to schedule.json, one per line so additions diff cleanly"""
+    lines = []
+    for start, n_rocks, n_minerals, rotation in eras:
+        era = {'from': start.isoformat(), 'rocks': n_rocks, 'minerals': n_minerals}
+        if rotation != SHUFFLED:
+            era['rotation'] = rotation
+        lines.append(json.dumps(era))
+    with open(path or SCHEDULE_PATH, 'w', encoding='utf-8') as f:
+        f.write('{\n  "eras": [\n    ' + ',\n    '.join(lines) + '\n  ]\n}\n')
+    load_schedule_eras.cache_clear()
+
+def extend_schedule(published, path=None):
+    """Let specimens appended to the catalog into the rotation after the date `published`
+
+    Adds an era starting the day after `published` when the catalog has
+    more rocks or minerals than the latest era uses, or widens the latest
+    era if it has not started yet. Returns the start of the new era, or
+    None when nothing changed. Raises ValueError if specimens were removed,
+    which would change dates already published.
+    """
+    catalog = load_catalog()
+    sizes = (len(catalog.rocks), len(catalog.minerals))
+    eras = list(load_schedule_eras(path))
+    start, n_rocks, n_minerals, rotation = eras[-1]
+    if sizes == (n_rocks, n_minerals):
+        return None
+    if sizes[0] < n_rocks or sizes[1] < n_minerals:
+        raise ValueError(f'{CATALOG_PATH} has fewer specimens than {path or SCHEDULE_PATH} schedules; '
+                         'removing specimens would change published dates')
+    if start > published:
+        eras[-1] = (start,) + sizes + (rotation,)
+    else:
+        start = published + timedelta(days=1)
+        eras.append((start,) + sizes + (SHUFFLED,))
+    save_schedule_eras(eras, path)
+    return start
+
+def extend_history(first, path=None):
+    """Record dates backfilled before the first era as published
+
+    The first era's date is where the published history starts. A
+    day-of-year era is simply moved back to `first`, which keeps its
+    rotation; a shuffled one is preceded by a new era, since moving its
+    start would reshuffle dates already published. Returns the new start,
+    or None when `first` is not earlier.
+    """
+    eras = list(load_schedule_eras(path))
+    start, n_rocks, n_minerals, rotation = eras[0]
+    if first >= start:
+        return None
+    if rotation == DAY_OF_YEAR:
+        eras[0] = (first, n_rocks, n_minerals, rotation)
+    else:
+        eras.insert(0, (first, n_rocks, n_minerals, rotation))
+    save_schedule_eras(eras, path)
+    return first
+
+def schedule_eras_from(date):
+    """The eras in effect from date on, as (start, end or None, rotation), oldest first
+
+    The rotation is a Schedule or a DayOfYearRotation.
+    """
+    eras = load_schedule_eras()
+    position = max(bisect.bisect_right([era[0].toordinal() for era in eras], date.toordinal()) - 1, 0)
+    for index in range(position, len(eras)):
+        start, n_rocks, n_minerals, rotation = eras[index]
+        end = eras[index + 1][0] if index + 1 < len(eras) else None
+        if rotation == DAY_OF_YEAR:
+            yield start, end, DayOfYearRotation(n_rocks, n_minerals)
+        else:
+            yield start, end, get_schedule(n_rocks, n_minerals, epoch=start)
 
 def get_specimens_for_date(date):
     """Get rock and mineral for a specific date"""
-    day = get_day_of_year(date)
-    rock_index = day % len(rocks)
-    mineral_index = day % len(minerals)
-    return rocks[rock_index], minerals[mineral_index]
+    catalog = load_catalog()
+    _, _, schedule = next(schedule_eras_from(date))
+    rock_index, mineral_index = schedule.indexes_for_date(date)
+    return catalog.rocks[rock_index], catalog.minerals[mineral_index]
+
+def next_featured_date(name, after):
+    """Find the next date after `after` featuring the named rock or mineral, or None"""
+    catalog = load_catalog()
+    specimen = catalog.get(name)
+    if specimen is None:
+        return None
+    for start, end, schedule in schedule_eras_from(after):
+        n_specimens = schedule.n_rocks if specimen.category == 'rock' else schedule.n_minerals
+        if specimen.index < n_specimens:
+            date = schedule.next_featured(specimen.category, specimen.index, max(after, start - timedelta(days=1)))
+            if end is None or date < end:
+                return date
+    return None
 
 def create_daily_page(date, rock, mineral, base_url):
     """Create individual HTML page for a specific day"""
-    date_str = date.strftime('%Y-%m-%d')
-    formatted_date = date.strftime('%B %d, %Y')
-    
-    # Escape single quotes in descriptions for JavaScript
-    rock_desc = rock['desc'].replace("'", "\\'")
-    mineral_desc = mineral['desc'].replace("'", "\\'")
-    
-    html = f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{rock['name']} & {mineral['name']} - Rock & Mineral of the Day</title>
-    <script crossorigin src="https://unpkg.com/react@18/umd/react.production.min.js"></script>
-    <script crossorigin src="https://unpkg.com/react-dom@18/umd/react-dom.production.min.js"></script>
-    <script src="https://unpkg.com/@babel/standalone/babel.min.js"></script>
-    <script src="https://cdn.tailwindcss.com"></script>
-</head>
-<body>
-    <div id="root"></div>
-
-    <script type="text/babel">
-        const {{ useState, useEffect }} = React;
-
-        const DailyPage = () => {{
-            const [rockData, setRockData] = useState(null);
-            const [mineralData, setMineralData] = useState(null);
-            const [loading, setLoading] = useState(true);
-
-            const rockName = "{rock['name']}";
-            const mineralName = "{mineral['name']}";
-            const rockDesc = `{rock_desc}`;
-            const mineralDesc = `{mineral_desc}`;
-
-            useEffect(() => {{
-                const fetchData = async (name, isRock) => {{
-                    const fallback = {{
-                        title: name,
-                        extract: isRock ? rockDesc : mineralDesc,
-                        thumbnail: null,
-                        url: `https://en.wikipedia.org/wiki/${{encodeURIComponent(name)}}`
-                    }};
-
-                    try {{
-                        const params = new URLSearchParams({{
-                            action: 'query',
-                            format: 'json',
-                            prop: 'extracts|pageimages',
-                            exintro: true,
-                            explaintext: true,
-                            piprop: 'thumbnail|original',
-                            pithumbsize: 800,
-                            titles: name,
-                            origin: '*',
-                            redirects: 1
-                        }});
-
-                        const response = await fetch(`https://en.wikipedia.org/w/api.php?${{params}}`);
-                        if (!response.ok) return fallback;
-
-                        const data = await response.json();
-                        const pages = data.query.pages;
-                        const pageId = Object.keys(pages)[0];
-                        const pageData = pages[pageId];
-
-                        if (pageId === '-1' || !pageData.extract) return fallback;
-
-                        return {{
-                            title: pageData.title,
-                            extract: pageData.extract,
-                            thumbnail: pageData.thumbnail,
-                            url: `https://en.wikipedia.org/wiki/${{encodeURIComponent(name)}}`
-                        }};
-                    }} catch (err) {{
-                        return fallback;
-                    }}
-                }};
-
-                const loadData = async () => {{
-                    const [rock, mineral] = await Promise.all([
-                        fetchData(rockName, true),
-                        fetchData(mineralName, false)
-                    ]);
-                    setRockData(rock);
-                    setMineralData(mineral);
-                    setLoading(false);
-                }};
-
-                loadData();
-            }}, []);
-
-            if (loading) {{
-                return (
-                    <div className="min-h-screen bg-gradient-to-br from-slate-800 to-slate-900 flex items-center justify-center">
-                        <p className="text-slate-300 text-lg">Loading...</p>
-                    </div>
-                );
-            }}
-
-            return (
-                <div className="min-h-screen bg-gradient-to-br from-slate-800 to-slate-900 p-4 md:p-8">
-                    <div className="max-w-4xl mx-auto">
-                        <div className="text-center mb-8">
-                            <h1 className="text-4xl md:text-5xl font-bold text-cyan-400 mb-2">
-                                🪨 Rock & Mineral of the Day
-                            </h1>
-                            <p className="text-slate-300 text-lg">{formatted_date}</p>
-                            <a href="{base_url}" className="text-cyan-400 hover:text-cyan-300 text-sm mt-2 inline-block">← Back to All Posts</a>
-                        </div>
-
-                        <div className="mb-8">
-                            <h2 className="text-2xl font-bold text-cyan-300 mb-4 flex items-center gap-2">
-                                <span className="text-3xl">🪨</span> Today's Rock
-                            </h2>
-                            <div className="bg-slate-700/50 backdrop-blur rounded-xl shadow-2xl overflow-hidden border border-slate-600">
-                                {{rockData.thumbnail && (
-                                    <div className="relative h-64 md:h-96 bg-slate-900">
-                                        <img 
-                                            src={{rockData.thumbnail.source}} 
-                                            alt={{rockData.title}}
-                                            className="w-full h-full object-contain p-4"
-                                        />
-                                    </div>
-                                )}}
-                                <div className="p-6 md:p-8">
-                                    <h3 className="text-3xl md:text-4xl font-bold text-cyan-300 mb-4">
-                                        {{rockData.title}}
-                                    </h3>
-                                    <p className="text-slate-200 text-lg leading-relaxed mb-6">
-                                        {{rockData.extract}}
-                                    </p>
-                                    <a 
-                                        href={{rockData.url}}
-                                        target="_blank"
-                                        rel="noopener noreferrer"
-                                        className="bg-cyan-500 hover:bg-cyan-600 text-slate-900 font-semibold px-6 py-2 rounded-lg transition-colors duration-200 inline-block"
-                                    >
-                                        Learn More on Wikipedia
-                                    </a>
-                                </div>
-                            </div>
-                        </div>
-
-                        <div className="mb-8">
-                            <h2 className="text-2xl font-bold text-emerald-300 mb-4 flex items-center gap-2">
-                                <span className="text-3xl">💎</span> Today's Mineral
-                            </h2>
-                            <div className="bg-slate-700/50 backdrop-blur rounded-xl shadow-2xl overflow-hidden border border-slate-600">
-                                {{mineralData.thumbnail && (
-                                    <div className="relative h-64 md:h-96 bg-slate-900">
-                                        <img 
-                                            src={{mineralData.thumbnail.source}} 
-                                            alt={{mineralData.title}}
-                                            className="w-full h-full object-contain p-4"
-                                        />
-                                    </div>
-                                )}}
-                                <div className="p-6 md:p-8">
-                                    <h3 className="text-3xl md:text-4xl font-bold text-emerald-300 mb-4">
-                                        {{mineralData.title}}
-                                    </h3>
-                                    <p className="text-slate-200 text-lg leading-relaxed mb-6">
-                                        {{mineralData.extract}}
-                                    </p>
-                                    <a 
-                                        href={{mineralData.url}}
-                                        target="_blank"
-                                        rel="noopener noreferrer"
-                                        className="bg-emerald-500 hover:bg-emerald-600 text-slate-900 font-semibold px-6 py-2 rounded-lg transition-colors duration-200 inline-block"
-                                    >
-                                        Learn More on Wikipedia
-                                    </a>
-                                </div>
-                            </div>
-                        </div>
-                    </div>
-                </div>
-            );
-        }};
-
-        ReactDOM.render(<DailyPage />, document.getElementById('root'));
-    </script>
-</body>
-</html>"""
-    
-    return html
-
-def create_index_page(dates_and_specimens, base_url):
-    """Create homepage with list of all posts"""
-    
-    posts_html = ""
+    return load_template('daily.html').render(
+        title=f"{rock['name']} & {mineral['name']} - Rock & Mineral of the Day",
+        rock_name=rock['name'],
+        mineral_name=mineral['name'],
+        rock_desc=rock['desc'],
+        mineral_desc=mineral['desc'],
+        formatted_date=date.strftime('%B %d, %Y'),
+        base_url=base_url,
+    )
+
+THUMBNAIL = Template("""
+                <div class="relative h-64 md:h-96 bg-slate-900">
+                    <img src="{{ source|attr }}" alt="{{ title|attr }}"{{ size_attrs|raw }} loading="lazy" decoding="async" class="w-full h-full object-contain p-4">
+                </div>""", 'thumbnail')
+
+PICTURE = Template("""
+                <div class="relative h-64 md:h-96 bg-slate-900">
+                    <picture class="block w-full h-full">{{ sources|raw }}
+                        <img src="{{ src|attr }}" alt="{{ title|attr }}"{{ size_attrs|raw }} loading="lazy" decoding="async" class="w-full h-full object-contain p-4">
+                    </picture>
+                </div>""", 'picture')
+
+PICTURE_SOURCE = Template("""
+                        <source type="{{ type|attr }}" srcset="{{ srcset|attr }}" sizes="{{ sizes|attr }}">""", 'picture_source')
+
+SIZE_ATTRS = Template(' width="{{ width|attr }}" height="{{ height|attr }}"', 'size_attrs')
+
+ARCHIVE_LINK = Template('<a href="{{ url|attr }}" class="text-cyan-400 hover:text-cyan-300 underline">{{ year }}</a>', 'archive_link')
+
+ARCHIVE_LINKS = Template("""
+            <p class="text-slate-400 text-sm mt-2">Archive: {{ links|raw }}</p>""", 'archive_links')
+
+PAGE_LINK = Template('<a href="{{ url|attr }}" class="text-cyan-400 hover:text-cyan-300">{{ label }}</a>', 'page_link')
+
+PAGINATION = Template("""
+        <nav class="flex justify-between items-center mt-12 text-slate-300">
+            {{ newer|raw }}
+            <span class="text-slate-400 text-sm">Page {{ page }}</span>
+            {{ older|raw }}
+        </nav>
+""", 'pagination')
+
+def render_specimen_card(info, accent):
+    """Render one pre-fetched Wikipedia summary as a static HTML card
+
+    A locally mirrored image (info['image'], from images.ImagePipeline) is
+    preferred over hot-linking the Wikimedia thumbnail.
+    """
+    thumbnail_html = ''
+    thumbnail = info.get('thumbnail')
+    image = info.get('image')
+    if image:
+        size_attrs = ''
+        if image['width'] and image['height']:
+            size_attrs = SIZE_ATTRS.render(width=image['width'], height=image['height'])
+        sources = ''.join(PICTURE_SOURCE.render(type=source['type'], srcset=source['srcset'], sizes=image['sizes'])
+                          for source in image['sources'])
+        thumbnail_html = PICTURE.render(sources=sources, src=image['src'], title=info['title'], size_attrs=size_attrs)
+    elif thumbnail:
+        size_attrs = ''
+        if thumbnail.get('width') and thumbnail.get('height'):
+            size_attrs = SIZE_ATTRS.render(width=thumbnail['width'], height=thumbnail['height'])
+        thumbnail_html = THUMBNAIL.render(source=thumbnail['source'], title=info['title'], size_attrs=size_attrs)
+
+    return load_template('specimen_card.html').render(
+        thumbnail=thumbnail_html,
+        accent=accent,
+        title=info['title'],
+        extract=info['extract'],
+        url=info['url'],
+    )
+
+def create_static_daily_page(date, rock_info, mineral_info, base_url):
+    """Create a daily page with Wikipedia content rendered in at build time
+
+    Unlike create_daily_page, the result needs no JavaScript: the extracts
+    and thumbnails are fetched by wiki_fetch and styling comes from
+    the precompiled static/style.css.
+    """
+    return load_template('daily_static.html').render(
+        title=f"{rock_info['title']} & {mineral_info['title']} - Rock & Mineral of the Day",
+        stylesheet_url=f'{base_url}/{asset_path(STYLESHEET_NAME)}',
+        formatted_date=date.strftime('%B %d, %Y'),
+        base_url=base_url,
+        rock_card=render_specimen_card(rock_info, 'cyan'),
+        mineral_card=render_specimen_card(mineral_info, 'emerald'),
+    )
+
+def render_post_summary(date, rock, mineral, base_url):
+    """Render one post as a card linking to its daily page"""
+    return load_template('post_summary.html').render(
+        page_url=f"{base_url}/{date.strftime('%Y-%m-%d')}.html",
+        rock_name=rock['name'],
+        mineral_name=mineral['name'],
+        formatted_date=date.strftime('%B %d, %Y'),
+        rock_desc=rock['desc'][:100] + "...",
+        mineral_desc=mineral['desc'][:100] + "...",
+    )
+
+def render_listing_page(title, subtitle, items_html, base_url, nav_html='', archive_years=()):
+    """Wrap a list of cards in the shared static layout of index and archive pages
+
+    subtitle and items_html are inserted as markup; items_html is a list of
+    fragments that is joined once with the rest of the page.
+    """
+    archive_html = ''
+    if archive_years:
+        links = ' · '.join(ARCHIVE_LINK.render(url=f'{base_url}/{archive_filename(year)}', year=year)
+                           for year in archive_years)
+        archive_html = ARCHIVE_LINKS.render(links=links)
+
+    return load_template('listing.html').render(
+        title=title,
+        stylesheet_url=f'{base_url}/{asset_path(STYLESHEET_NAME)}',
+        search_script_url=f'{base_url}/{asset_path(SEARCH_SCRIPT_NAME)}',
+        base_url=base_url,
+        subtitle=subtitle,
+        items='\n'.join(items_html),
+        nav=nav_html,
+        feed_url=f'{base_url}/feed.xml',
+        atom_url=f'{base_url}/atom.xml',
+        json_feed_url=f'{base_url}/feed.json',
+        archive=archive_html,
+    )
+
+def index_filename(page, total_pages=1):
+    """Output path of a page of the paginated index
+
+    Pages are numbered from the oldest posts (page 1), and the newest page
+    is the homepage, so existing page numbers keep their posts as new
+    posts arrive.
+    """
+    return 'index.html' if page >= total_pages else f'page/{page}.html'
+
+def archive_filename(year, month=None):
+    """Output path of a per-year or per-month archive page"""
+    return f'archive/{year}.html' if month is None else f'archive/{year}-{month:02d}.html'
+
+def render_pagination(page, total_pages, base_url):
+    """Newer/older links between pages of the index"""
+    if total_pages <= 1:
+        return ''
+    newer = older = '<span></span>'
+    if page < total_pages:
+        newer = PAGE_LINK.render(url=f'{base_url}/{index_filename(page + 1, total_pages)}', label='← Newer posts')
+    if page > 1:
+        older = PAGE_LINK.render(url=f'{base_url}/{index_filename(page - 1, total_pages)}', label='Older posts →')
+    return PAGINATION.render(newer=newer, older=older, page=page)
+
+def create_index_page(dates_and_specimens, base_url, page=1, total_pages=1, archive_years=()):
+    """Create one page of the homepage listing, newest posts first"""
+    items_html = [render_post_summary(date, rock, mineral, base_url)
+                  for date, rock, mineral in dates_and_specimens]
+    title = 'Rock & Mineral of the Day'
+    if page < total_pages:
+        title = f'Page {page} - {title}'
+    return render_listing_page(title, 'Daily geology education featuring rocks and minerals from Wikipedia',
+                               items_html, base_url, render_pagination(page, total_pages, base_url),
+                               archive_years)
+
+def create_month_archive_page(year, month, dates_and_specimens, base_url, archive_years=()):
+    """Create the archive page listing every post of one month"""
+    label = datetime(year, month, 1).strftime('%B %Y')
+    items_html = [render_post_summary(date, rock, mineral, base_url)
+                  for date, rock, mineral in dates_and_specimens]
+    subtitle = f"Archive for {escape_html(label)} · {PAGE_LINK.render(url=f'{base_url}/{archive_filename(year)}', label=year)}"
+    return render_listing_page(f'{label} - Rock & Mineral of the Day', subtitle, items_html, base_url,
+                               archive_years=archive_years)
+
+def create_year_archive_page(year, month_counts, base_url, archive_years=()):
+    """Create the archive page for a year, linking to each of its months
+
+    month_counts is a list of (month, number_of_posts), newest first.
+    """
+    items_html = []
+    for month, count in month_counts:
+        items_html.append(load_template('month_summary.html').render(
+            url=f'{base_url}/{archive_filename(year, month)}',
+            label=datetime(year, month, 1).strftime('%B %Y'),
+            count_label=f"{count} post{'s' if count != 1 else ''}",
+        ))
+    return render_listing_page(f'{year} - Rock & Mineral of the Day', f'Archive for {year}', items_html, base_url,
+                               archive_years=archive_years)
+
+def generate_index_pages(dates_and_specimens, base_url, page_size=INDEX_PAGE_SIZE):
+    """Yield (filename, html) for every index and archive page in one pass
+
+    Posts are sorted newest first once; index pages take fixed-size slices
+    of that order while posts are grouped into month and year archives on
+    the same walk, so the size of each page stays bounded as history grows.
+    Slices are counted from the oldest post, and the newest page (the
+    homepage) also holds the posts that do not fill a slice yet, so a new
+    post only changes the homepage, plus the page before it whenever the
+    homepage fills up and a new page starts.
+    """
+    posts = sorted(dates_and_specimens, key=lambda post: post[0], reverse=True)
+    total_pages = max(1, len(posts) // page_size)
+
+    months = {}
+    years = {}
+    for post in posts:
+        key = (post[0].year, post[0].month)
+        if key not in months:
+            months[key] = []
+            years.setdefault(key[0], []).append(key[1])
+        months[key].append(post)
+    archive_years = list(years)
+
+    for page in range(total_pages, 0, -1):
+        end = len(posts) - (page - 1) * page_size
+        page_posts = posts[:end] if page == total_pages else posts[end - page_size:end]
+        yield (index_filename(page, total_pages),
+               create_index_page(page_posts, base_url, page, total_pages, archive_years))
+
+    for year in archive_years:
+        month_counts = [(month, len(months[(year, month)])) for month in years[year]]
+        yield archive_filename(year), create_year_archive_page(year, month_counts, base_url, archive_years)
+        for month, _ in month_counts:
+            yield (archive_filename(year, month),
+                   create_month_archive_page(year, month, months[(year, month)], base_url, archive_years))
+
+def publish_time(date, publish_timezone=timezone.utc):
+    """UTC moment at which a date's post goes out in the publish timezone"""
+    return datetime.combine(date, PUBLISH_TIME, tzinfo=publish_timezone).astimezone(timezone.utc)
+
+def feed_items(dates_and_specimens, base_url, publish_timezone=timezone.utc):
+    """Yield the feed entry of each (date, rock, mineral), rendering its description once"""
     for date, rock, mineral in dates_and_specimens:
-        date_str = date.strftime('%Y-%m-%d')
-        formatted_date = date.strftime('%B %d, %Y')
-        
-        # Escape quotes for JSX
-        rock_desc_short = rock['desc'][:100].replace('"', '\\"').replace("'", "\\'") + "..."
-        mineral_desc_short = mineral['desc'][:100].replace('"', '\\"').replace("'", "\\'") + "..."
-        
-        posts_html += f'''
-                    <a href="{base_url}/{date_str}.html" className="block bg-slate-700/50 backdrop-blur rounded-lg p-6 border border-slate-600 hover:border-cyan-400 transition-colors duration-200">
-                        <div className="flex items-start gap-4">
-                            <div className="text-4xl">🪨💎</div>
-                            <div className="flex-1">
-                                <h2 className="text-2xl font-bold text-cyan-300 mb-2">
-                                    {rock['name']} & {mineral['name']}
-                                </h2>
-                                <p className="text-slate-400 text-sm mb-3">{formatted_date}</p>
-                                <div className="space-y-2">
-                                    <p className="text-slate-300"><span className="text-cyan-400 font-semibold">Rock:</span> {rock_desc_short}</p>
-                                    <p className="text-slate-300"><span className="text-emerald-400 font-semibold">Mineral:</span> {mineral_desc_short}</p>
-                                </div>
-                            </div>
-                        </div>
-                    </a>'''
-    
-    html = f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Rock & Mineral of the Day</title>
-    <script crossorigin src="https://unpkg.com/react@18/umd/react.production.min.js"></script>
-    <script crossorigin src="https://unpkg.com/react-dom@18/umd/react-dom.production.min.js"></script>
-    <script src="https://unpkg.com/@babel/standalone/babel.min.js"></script>
-    <script src="https://cdn.tailwindcss.com"></script>
-</head>
-<body>
-    <div id="root"></div>
-
-    <script type="text/babel">
-        const IndexPage = () => {{
-            return (
-                <div className="min-h-screen bg-gradient-to-br from-slate-800 to-slate-900 p-4 md:p-8">
-                    <div className="max-w-4xl mx-auto">
-                        <div className="text-center mb-12">
-                            <h1 className="text-5xl md:text-6xl font-bold text-cyan-400 mb-4">
-                                🪨 Rock & Mineral of the Day
-                            </h1>
-                            <p className="text-slate-300 text-lg">
-                                Daily geology education featuring rocks and minerals from Wikipedia
-                            </p>
-                        </div>
-
-                        <div className="space-y-6">
-                            {posts_html}
-                        </div>
-
-                        <div className="mt-12 bg-slate-700/30 rounded-lg p-6 text-center">
-                            <p className="text-slate-300">
-                                Subscribe to the <a href="{base_url}/feed.xml" className="text-cyan-400 hover:text-cyan-300 underline">RSS feed</a> to get daily updates
-                            </p>
-                        </div>
-                    </div>
-                </div>
-            );
-        }};
-
-        ReactDOM.render(<IndexPage />, document.getElementById('root'));
-    </script>
-</body>
-</html>"""
-    
-    return html
+        page_url = f"{base_url}/{date.strftime('%Y-%m-%d')}.html"
+        yield {
+            'date': date,
+            'title': f"{rock['name']} & {mineral['name']} - {date.strftime('%B %d, %Y')}",
+            'url': page_url,
+            'description': load_template('feed_description.html').render(
+                rock_name=rock['name'],
+                rock_desc=rock['desc'],
+                rock_url=wiki_fetch.article_url(rock['name']),
+                mineral_name=mineral['name'],
+                mineral_desc=mineral['desc'],
+                mineral_url=wiki_fetch.article_url(mineral['name']),
+                page_url=page_url,
+            ),
+            'published': publish_time(date, publish_timezone),
+        }
+
+def feed_meta(base_url, filename):
+    """Channel metadata of the feed published at filename"""
+    return dict(FEED_META, link=base_url, self_url=f'{base_url}/{filename}')
+
+def feed_archive_filename(year, month):
+    """Output path of the RFC 5005 archive feed of one month"""
+    return f'feeds/{year}-{month:02d}.xml'
+
+def write_rss_feed(out, dates_and_specimens, base_url):
+    """Stream an RSS feed to a text file object, one item at a time
+
+    dates_and_specimens may be any iterable, including a generator, so a
+    feed with thousands of items is written in constant memory.
+    lastBuildDate is the newest item's date, so the bytes only change
+    when the items do.
+    """
+    writer = None
+    for item in feed_items(dates_and_specimens, base_url):
+        if writer is None:
+            writer = RssWriter(out, feed_meta(base_url, 'feed.xml'), item['published'])
+        writer.item(item)
+    if writer is None:
+        writer = RssWriter(out, feed_meta(base_url, 'feed.xml'))
+    writer.close()
 
 def create_rss_feed(dates_and_specimens, base_url):
     """Generate RSS feed with recent posts"""
-    now = datetime.utcnow()
-    
-    rss = ET.Element('rss', version='2.0')
-    rss.set('xmlns:atom', 'http://www.w3.org/2005/Atom')
-    
-    channel = ET.SubElement(rss, 'channel')
-    
-    ET.SubElement(channel, 'title').text = 'Rock & Mineral of the Day'
-    ET.SubElement(channel, 'link').text = base_url
-    ET.SubElement(channel, 'description').text = 'Daily geology education featuring a different rock and mineral each day from Wikipedia'
-    ET.SubElement(channel, 'language').text = 'en-us'
-    ET.SubElement(channel, 'lastBuildDate').text = now.strftime('%a, %d %b %Y %H:%M:%S +0000')
-    
-    atom_link = ET.SubElement(channel, 'atom:link')
-    atom_link.set('href', f'{base_url}/feed.xml')
-    atom_link.set('rel', 'self')
-    atom_link.set('type', 'application/rss+xml')
-    
-    # Add items for each date (most recent first)
-    for date, rock, mineral in dates_and_specimens:
-        date_str = date.strftime('%Y-%m-%d')
-        formatted_date = date.strftime('%B %d, %Y')
-        
-        item = ET.SubElement(channel, 'item')
-        
-        title = f"{rock['name']} & {mineral['name']} - {formatted_date}"
-        ET.SubElement(item, 'title').text = title
-        
-        # Link to the specific daily page
-        ET.SubElement(item, 'link').text = f"{base_url}/{date_str}.html"
-        
-        description = f"""<h2>🪨 Today's Rock: {rock['name']}</h2>
-<p>{rock['desc']}</p>
-<p><a href="https://en.wikipedia.org/wiki/{rock['name'].replace(' ', '_')}">Learn more about {rock['name']} on Wikipedia</a></p>
-
-<h2>💎 Today's Mineral: {mineral['name']}</h2>
-<p>{mineral['desc']}</p>
-<p><a href="https://en.wikipedia.org/wiki/{mineral['name'].replace(' ', '_')}">Learn more about {mineral['name']} on Wikipedia</a></p>
-
-<p><em>Visit the <a href="{base_url}/{date_str}.html">full post</a> for images and complete Wikipedia articles.</em></p>"""
-        
-        ET.SubElement(item, 'description').text = description
-        
-        guid = ET.SubElement(item, 'guid', isPermaLink='true')
-        guid.text = f"{base_url}/{date_str}.html"
-        
-        pub_date = date.replace(hour=6, minute=0, second=0, microsecond=0)
-        ET.SubElement(item, 'pubDate').text = pub_date.strftime('%a, %d %b %Y %H:%M:%S +0000')
-    
-    xml_str = minidom.parseString(ET.tostring(rss)).toprettyxml(indent='  ')
-    return xml_str
+    out = io.StringIO()
+    write_rss_feed(out, dates_and_specimens, base_url)
+    return out.getvalue()
 
-if __name__ == '__main__':
-    import sys
-    
-    if len(sys.argv) > 1:
-        base_url = sys.argv[1]
+def previous_month(year, month):
+    """(year, month) of the month before"""
+    return (year, month - 1) if month > 1 else (year - 1, 12)
+
+def render_feeds(dates_and_specimens, base_url, begin, finish, feed_size=FEED_SIZE,
+                 publish_timezone=timezone.utc):
+    """Render every feed in one pass over the post history, yielding (filename, result)
+
+    dates_and_specimens is the whole published history, newest first.
+    begin(filename) returns a text file to write a feed to, and
+    finish(filename, file) completes it and returns the result. Each item
+    is rendered once and fanned out to:
+    - the subscription feeds (feed.xml, atom.xml and feed.json), which hold
+      the newest feed_size posts and the rest of the newest month;
+    - the archive feed of its month, for every month before the newest one
+      that the history covers completely;
+    - the complete feed of every post.
+
+    Archive feeds link to feed.xml (current) and to the month before
+    (prev-archive), as RFC 5005 describes. They have no next-archive link,
+    so a month's archive never changes once it is written.
+    """
+    if not dates_and_specimens:
+        return
+    newest, oldest = dates_and_specimens[0][0], dates_and_specimens[-1][0]
+    newest_month = (newest.year, newest.month)
+    oldest_month = (oldest.year, oldest.month)
+
+    def archived(month):
+        return oldest_month <= month < newest_month and (month > oldest_month or oldest.day == 1)
+
+    def archive_links(month):
+        links = [('current', f'{base_url}/feed.xml')]
+        if archived(previous_month(*month)):
+            links.append(('prev-archive', f'{base_url}/{feed_archive_filename(*previous_month(*month))}'))
+        return links
+
+    writers = {}
+    archive = None
+
+    def start(filename, make_writer, updated):
+        f = begin(filename)
+        writers[filename] = (f, make_writer(f, feed_meta(base_url, filename), updated))
+
+    def close(filename):
+        f, writer = writers.pop(filename)
+        writer.close()
+        return filename, finish(filename, f)
+
+    for count, item in enumerate(feed_items(dates_and_specimens, base_url, publish_timezone)):
+        month = (item['date'].year, item['date'].month)
+        if count == 0:
+            subscription_links = [link for link in archive_links(month) if link[0] == 'prev-archive']
+            start(COMPLETE_FEED_NAME, functools.partial(RssWriter, history='complete'), item['published'])
+            start('feed.xml', functools.partial(RssWriter, links=subscription_links), item['published'])
+            start('atom.xml', AtomWriter, item['published'])
+            start('feed.json', JsonFeedWriter, item['published'])
+        elif count >= feed_size and month != newest_month and 'feed.xml' in writers:
+            for filename in ('feed.xml', 'atom.xml', 'feed.json'):
+                yield close(filename)
+
+        filename = feed_archive_filename(*month) if archived(month) else None
+        if filename != archive:
+            if archive is not None:
+                yield close(archive)
+            archive = filename
+            if archive is not None:
+                start(archive, functools.partial(RssWriter, links=archive_links(month), history='archive'),
+                      item['published'])
+
+        for _, writer in writers.values():
+            writer.item(item)
+
+    for filename in list(writers):
+        yield close(filename)
+
+def write_feeds(out_dir, dates_and_specimens, base_url, manifest=None, feed_size=FEED_SIZE,
+                publish_timezone=timezone.utc):
+    """Write every feed of render_feeds to out_dir, yielding (filename, changed)"""
+    return render_feeds(dates_and_specimens, base_url,
+                        begin=lambda filename: begin_output(out_dir, filename),
+                        finish=lambda filename, f: finish_output(out_dir, filename, f, manifest),
+                        feed_size=feed_size, publish_timezone=publish_timezone)
+
+def content_hash(data):
+    """Return the SHA-256 hex digest of a str or bytes payload"""
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    return hashlib.sha256(data).hexdigest()
+
+def specimen_fingerprint(specimen):
+    """Identify a specimen by name plus a short hash of its curated text"""
+    return f"{specimen['name']}@{content_hash(specimen['desc'])[:12]}"
+
+def load_manifest(out_dir):
+    """Load the build manifest left by the previous run, or start an empty one"""
+    path = os.path.join(out_dir, MANIFEST_NAME)
+    try:
+        with open(path, encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {'files': {}}
+    if not isinstance(manifest.get('files'), dict):
+        return {'files': {}}
+    return manifest
+
+def save_manifest(manifest, out_dir):
+    """Write the build manifest with stable ordering so it diffs cleanly"""
+    path = os.path.join(out_dir, MANIFEST_NAME)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+def is_up_to_date(manifest, out_dir, filename, inputs):
+    """Check whether an output was built from the same inputs and is untouched on disk"""
+    entry = manifest['files'].get(filename)
+    if entry is None or entry.get('inputs') != inputs:
+        return False
+    try:
+        with open(os.path.join(out_dir, filename), 'rb') as f:
+            return content_hash(f.read()) == entry['sha256']
+    except OSError:
+        return False
+
+def write_output(out_dir, filename, content, manifest=None, inputs=None):
+    """Write an output file unless identical bytes are already on disk
+
+    Returns True if the file was written. When a manifest is given, the
+    file's hash and inputs are recorded in it either way.
+    """
+    data = content.encode('utf-8')
+    digest = content_hash(data)
+    path = os.path.join(out_dir, filename)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    try:
+        with open(path, 'rb') as f:
+            changed = f.read() != data
+    except OSError:
+        changed = True
+
+    if changed:
+        with open(path, 'wb') as f:
+            f.write(data)
+
+    if manifest is not None:
+        manifest['files'][filename] = {'sha256': digest, 'inputs': inputs}
+    return changed
+
+def begin_output(out_dir, filename):
+    """Open a temporary file to stream an output into; complete it with finish_output"""
+    path = os.path.join(out_dir, filename)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    return open(f'{path}.tmp', 'w', encoding='utf-8', newline='')
+
+def finish_output(out_dir, filename, f, manifest=None, inputs=None):
+    """Close a file from begin_output and replace the target only if its bytes differ
+
+    Returns True if the file was written.
+    """
+    f.close()
+    path = os.path.join(out_dir, filename)
+    tmp_path = f'{path}.tmp'
+
+    digest = hashlib.sha256()
+    with open(tmp_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            digest.update(chunk)
+
+    changed = not (os.path.exists(path) and filecmp.cmp(tmp_path, path, shallow=False))
+    if changed:
+        os.replace(tmp_path, path)
     else:
-        base_url = 'https://yourusername.github.io/rockandminotd'
-    
-    # Generate pages for last 30 days
-    now = datetime.utcnow()
-    dates_and_specimens = []
-    
-    for days_ago in range(30):
-        date = now - timedelta(days=days_ago)
-        rock, mineral = get_specimens_for_date(date)
-        dates_and_specimens.append((date, rock, mineral))
-        
-        # Create daily page
+        os.remove(tmp_path)
+
+    if manifest is not None:
+        manifest['files'][filename] = {'sha256': digest.hexdigest(), 'inputs': inputs}
+    return changed
+
+def write_output_stream(out_dir, filename, render, manifest=None, inputs=None):
+    """Like write_output, but for content streamed by render(file) in constant memory
+
+    The output goes to a temporary file that replaces the target only if
+    its bytes differ. Returns True if the file was written.
+    """
+    f = begin_output(out_dir, filename)
+    render(f)
+    return finish_output(out_dir, filename, f, manifest, inputs)
+
+def render_page(task):
+    """Render one daily page from a (date, rock, mineral, base_url, rock_info, mineral_info) task
+
+    A top-level function so that it can run in worker processes. The page
+    is pre-rendered when the Wikipedia summaries are given.
+    """
+    date, rock, mineral, base_url, rock_info, mineral_info = task
+    if rock_info is not None:
+        return create_static_daily_page(date, rock_info, mineral_info, base_url)
+    return create_daily_page(date, rock, mineral, base_url)
+
+def render_pages(tasks, jobs=1):
+    """Render page tasks, fanning out over `jobs` processes, yielding pages in task order
+
+    Workers receive tasks and return pages in chunks, so the parent writes
+    each chunk while the next ones are still being rendered.
+    """
+    if jobs <= 1 or len(tasks) < 2:
+        yield from map(render_page, tasks)
+        return
+    chunksize = max(1, len(tasks) // (jobs * 4))
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        yield from pool.map(render_page, tasks, chunksize=chunksize)
+
+def today(publish_timezone=timezone.utc):
+    """The current date in the publish timezone"""
+    return datetime.now(publish_timezone).date()
+
+def resolve_window(start=None, end=None, window=None, current=None):
+    """(start, end) of the dates to build
+
+    end defaults to current (today), or to window days after start;
+    start defaults to window (DEFAULT_WINDOW) days ending at end.
+    Raises ValueError for empty or overdetermined ranges.
+    """
+    if window is not None and window < 1:
+        raise ValueError('the window must be at least one day')
+    if start and end and window:
+        raise ValueError('give at most two of start, end and window')
+    if end is None:
+        end = start + timedelta(days=window - 1) if start and window else current or today()
+    if start is None:
+        start = end - timedelta(days=(window or DEFAULT_WINDOW) - 1)
+    if start > end:
+        raise ValueError('start must not be after end')
+    return start, end
+
+def date_range(start, end):
+    """Dates from end back to start, inclusive, newest first"""
+    return [Date.fromordinal(ordinal) for ordinal in range(end.toordinal(), start.toordinal() - 1, -1)]
+
+def history_range(published):
+    """(start, end) of the published history, ending on the date `published`
+
+    The history starts on the date of the first schedule era, which
+    backfills move earlier (see extend_history), so it comes from
+    schedule.json rather than from the dates being built. Feeds, listings
+    and search list every post in it, and --expired prune keeps its pages.
+    """
+    return load_schedule_eras()[0][0], published
+
+def expired_outputs(out_dir, outputs):
+    """Generated files in out_dir that are not among this build's outputs (or their siblings)"""
+    produced = set(outputs)
+    candidates = [name for name in os.listdir(out_dir)
+                  if DAILY_PAGE_NAME.fullmatch(name.removesuffix('.gz').removesuffix('.br'))]
+    for directory in PRUNED_DIRS:
+        for root, _, files in os.walk(os.path.join(out_dir, directory)):
+            candidates.extend(os.path.relpath(os.path.join(root, name), out_dir).replace(os.sep, '/')
+                              for name in files)
+    return sorted(name for name in candidates
+                  if name.removesuffix('.gz').removesuffix('.br') not in produced)
+
+def build(base_url, out_dir='.', incremental=False, static=False, cache=None, fetch_workers=4,
+          page_size=INDEX_PAGE_SIZE, dates=None, jobs=1, images=False, image_cache_dir=IMAGE_CACHE_DIR,
+          precompress=False, report=None, publish_timezone=timezone.utc, expired='keep', current=None):
+    """Generate daily pages, index and RSS feed for the given dates
+
+    dates defaults to the DEFAULT_WINDOW days ending today in
+    publish_timezone, which also sets the pubDate of each post. current
+    overrides today, e.g. to make benchmark builds repeatable. expired is
+    'keep' to leave pages from earlier windows in place or 'prune' to
+    delete generated files this build did not produce, except the daily
+    pages of the published history that the feeds link to. With static=True, daily pages are
+    pre-rendered from Wikipedia content fetched at build time instead of in
+    every browser. The content for all specimens in the window is fetched in
+    batches on a background thread (through cache, a wiki_fetch.SummaryCache,
+    when one is given) while the index and feed are rendered. jobs > 1
+    renders the daily pages on a pool of worker processes. images=True
+    mirrors the thumbnails of static pages into responsive local variants.
+    precompress=True writes .gz/.br siblings and cache header manifests.
+    Stage timings and counters are collected in report, an
+    instrument.BuildReport, which is returned.
+    """
+    if report is None:
+        report = BuildReport()
+    previous = load_manifest(out_dir) if incremental else {'files': {}}
+    manifest = {'files': {}} if incremental else None
+    outputs = []
+    written = skipped = 0
+
+    def record(filename, changed, message=None):
+        nonlocal written, skipped
+        outputs.append(filename)
+        if changed:
+            written += 1
+            report.count('files_written')
+            report.count('bytes_written', os.path.getsize(os.path.join(out_dir, filename)))
+            print(message or f"Created {filename}")
+        else:
+            skipped += 1
+            report.count('files_skipped')
+
+    def write(filename, content, inputs=None):
+        with report.span('write'):
+            return write_output(out_dir, filename, content, manifest, inputs)
+
+    if current is None:
+        current = today(publish_timezone)
+    if dates is None:
+        dates = date_range(*resolve_window(current=current))
+
+    with report.span('schedule'):
+        # Dates up to today and everything built now count as published
+        published = max(current, max(dates))
+        backfilled = extend_history(min(dates))
+        if backfilled is not None:
+            print(f"Published history now starts on {backfilled.isoformat()} ({SCHEDULE_PATH})")
+        joined = extend_schedule(published)
+        if joined is not None:
+            print(f"New specimens join the rotation on {joined.isoformat()} ({SCHEDULE_PATH})")
+        dates_and_specimens = []
+        for date in dates:
+            rock, mineral = get_specimens_for_date(date)
+            dates_and_specimens.append((date, rock, mineral))
+        # Every published post, newest first, for the listings and feeds;
+        # the schedule is deterministic, so older posts are recomputed
+        history = date_range(*history_range(published))
+        history_posts = [(date,) + get_specimens_for_date(date) for date in history]
+
+    # Daily pages are built for the window, plus any page of the history
+    # that is missing, so the feeds never link to a page that does not exist
+    window = set(dates)
+    daily_posts = dates_and_specimens + [post for post in history_posts if post[0] not in window and
+                                         not os.path.exists(os.path.join(out_dir, f'{post[0]:%Y-%m-%d}.html'))]
+
+    executor = summaries_future = None
+    if static:
+        specimens = [(s['name'], s['desc']) for _, rock, mineral in daily_posts for s in (rock, mineral)]
+        executor = ThreadPoolExecutor(max_workers=1)
+        summaries_future = executor.submit(wiki_fetch.fetch_summaries, specimens,
+                                           cache=cache, max_workers=fetch_workers)
+
+    # Create index and archive pages
+    for filename, page_html in report.timed('index', generate_index_pages(history_posts, base_url, page_size)):
+        record(filename, write(filename, page_html))
+
+    # Create the client-side search index
+    for filename, index_json in report.timed('search', generate_search_index(history_posts)):
+        record(filename, write(filename, index_json))
+
+    # Create the RSS, Atom and JSON feeds (rendered and written in one pass)
+    for filename, changed in report.timed('feed', write_feeds(out_dir, history_posts, base_url, manifest,
+                                                        publish_timezone=publish_timezone)):
+        record(filename, changed)
+
+    summaries = {}
+    if static:
+        with report.span('fetch_wait'):
+            summaries = summaries_future.result()
+        executor.shutdown()
+        if cache is not None:
+            for counter in ('hits', 'revalidated', 'fetched', 'offline'):
+                report.count(f'summary_cache_{counter}', getattr(cache, counter))
+
+    if static and images:
+        pipeline = ImagePipeline(out_dir, base_url, cache_dir=image_cache_dir)
+        thumbnails = {s['thumbnail']['source']: (s['thumbnail'].get('width'), s['thumbnail'].get('height'))
+                      for s in summaries.values() if s.get('thumbnail')}
+        with report.span('images'):
+            mirrored = pipeline.process_all(thumbnails, max_workers=fetch_workers)
+        report.count('images_downloaded', pipeline.downloaded)
+        report.count('image_variants_generated', pipeline.generated)
+        summaries = {name: dict(s, image=mirrored.get(s['thumbnail']['source'])) if s.get('thumbnail') else s
+                     for name, s in summaries.items()}
+        print(f"Mirrored {len(thumbnails)} images ({pipeline.downloaded} downloaded, "
+              f"{pipeline.generated} variants generated)")
+
+    # Create daily pages, skipping those that are already up to date
+    tasks = []
+    pending = []
+    for date, rock, mineral in daily_posts:
         date_str = date.strftime('%Y-%m-%d')
-        page_html = create_daily_page(date, rock, mineral, base_url)
-        
-        with open(f'{date_str}.html', 'w', encoding='utf-8') as f:
-            f.write(page_html)
-        
-        print(f"Created {date_str}.html - {rock['name']} & {mineral['name']}")
-    
-    # Create index page
-    index_html = create_index_page(dates_and_specimens, base_url)
-    with open('index.html', 'w', encoding='utf-8') as f:
-        f.write(index_html)
-    print("Created index.html")
-    
-    # Create RSS feed
-    feed_xml = create_rss_feed(dates_and_specimens, base_url)
-    with open('feed.xml', 'w', encoding='utf-8') as f:
-        f.write(feed_xml)
-    print("Created feed.xml")
-    
-    print(f"\nGenerated 30 daily pages, index, and RSS feed successfully!")
+        filename = f'{date_str}.html'
+        inputs = {
+            'date': date_str,
+            'rock': specimen_fingerprint(rock),
+            'mineral': specimen_fingerprint(mineral),
+            'template_version': TEMPLATE_VERSION,
+            'stylesheet': asset_path(STYLESHEET_NAME),
+            'base_url': base_url,
+        }
+        rock_info = mineral_info = None
+        if static:
+            rock_info, mineral_info = summaries[rock['name']], summaries[mineral['name']]
+            inputs['content'] = content_hash(json.dumps([rock_info, mineral_info], sort_keys=True))[:12]
+
+        if incremental and is_up_to_date(previous, out_dir, filename, inputs):
+            manifest['files'][filename] = previous['files'][filename]
+            report.count('manifest_hits')
+            record(filename, False)
+            continue
+
+        tasks.append((date, rock, mineral, base_url, rock_info, mineral_info))
+        pending.append((filename, inputs, rock, mineral))
+
+    for (filename, inputs, rock, mineral), page_html in zip(pending, report.timed('render', render_pages(tasks, jobs))):
+        record(filename, write(filename, page_html, inputs),
+               f"Created {filename} - {rock['name']} & {mineral['name']}")
+
+    for name in ASSET_NAMES:
+        with open(os.path.join(STATIC_DIR, name), encoding='utf-8') as f:
+            asset = f.read()
+        record(asset_path(name), write(asset_path(name), asset))
+
+    # Everything the site serves: this build's outputs, the daily pages of
+    # the whole history and the hashed assets that older pages link to
+    published_files = set(outputs) | {f'{date:%Y-%m-%d}.html' for date in history}
+    asset_dir = os.path.join(out_dir, publish.ASSET_DIR)
+    if os.path.isdir(asset_dir):
+        published_files.update(f'{publish.ASSET_DIR}/{name}' for name in os.listdir(asset_dir)
+                               if not name.endswith(('.gz', '.br')))
+    published_files = sorted(published_files)
+
+    if expired == 'prune':
+        with report.span('prune'):
+            for filename in expired_outputs(out_dir, published_files):
+                os.remove(os.path.join(out_dir, filename))
+                report.count('files_pruned')
+                print(f"Removed {filename}")
+
+    if incremental:
+        with report.span('manifest'):
+            save_manifest(manifest, out_dir)
+
+    if precompress:
+        with report.span('precompress'):
+            siblings = publish.precompress(out_dir, published_files)
+            publish.write_cache_manifests(out_dir, published_files,
+                                          {name: asset_path(name) for name in ASSET_NAMES})
+        report.count('compressed_files_written', siblings)
+        print(f"Precompressed outputs ({siblings} compressed files written)")
+
+    report.info.update(days=len(dates_and_specimens), daily_pages_rendered=len(pending), jobs=jobs, static=static,
+                       incremental=incremental)
+    report.finish()
+    print(f"\nGenerated {len(pending)} daily pages, index, archives and RSS feed successfully! "
+          f"({written} written, {skipped} unchanged)")
+    return report
+
+def parse_date(value):
+    """argparse type for YYYY-MM-DD dates"""
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f'invalid date {value!r}, expected YYYY-MM-DD')
+
+def parse_positive_int(value):
+    """argparse type for counts that must be at least 1"""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f'invalid number {value!r}')
+    if number < 1:
+        raise argparse.ArgumentTypeError(f'must be at least 1, got {number}')
+    return number
+
+def parse_timezone(value):
+    """argparse type for IANA timezone names such as Europe/Berlin"""
+    if value.upper() == 'UTC':
+        return timezone.utc
+    try:
+        return ZoneInfo(value)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise argparse.ArgumentTypeError(f'unknown timezone {value!r}')
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ['serve']:
+        import preview  # imported here because preview imports this module
+        return preview.main(argv[1:])
+
+    parser = argparse.ArgumentParser(description='Generate Rock & Mineral of the Day pages and RSS feed',
+                                     epilog='Run "generate_feed.py serve --help" for the local preview server.')
+    parser.add_argument('base_url', nargs='?', default='https://yourusername.github.io/rockandminotd',
+                        help='public URL the site is served from')
+    parser.add_argument('--output-dir', default='.',
+                        help='directory to write pages and feed into (default: current directory)')
+    parser.add_argument('--incremental', action='store_true',
+                        help=f'skip outputs whose inputs and content match {MANIFEST_NAME} from the last build')
+    parser.add_argument('--static', action='store_true',
+                        help='pre-render daily pages with Wikipedia content fetched at build time (no runtime JS)')
+    parser.add_argument('--images', action='store_true',
+                        help='with --static, serve resized local copies of specimen images instead of hot-linking Wikimedia')
+    parser.add_argument('--image-cache-dir', default=IMAGE_CACHE_DIR,
+                        help='where downloaded source images are cached (default: %(default)s)')
+    parser.add_argument('--precompress', action='store_true',
+                        help='write .gz/.br siblings of changed outputs plus _headers and asset-manifest.json')
+    parser.add_argument('--page-size', type=parse_positive_int, default=INDEX_PAGE_SIZE,
+                        help='posts per page of the paginated index (default: %(default)s)')
+    parser.add_argument('--cache-dir', default=wiki_fetch.CACHE_DIR,
+                        help='where fetched Wikipedia content is cached (default: %(default)s)')
+    parser.add_argument('--cache-ttl', type=float, default=wiki_fetch.DEFAULT_TTL / 3600,
+                        help='hours before cached content is revalidated or fetched again (default: %(default)s)')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='always fetch Wikipedia content instead of using the cache')
+    parser.add_argument('--fetch-workers', type=parse_positive_int, default=4,
+                        help='maximum concurrent Wikipedia API requests (default: %(default)s)')
+    parser.add_argument('--start', type=parse_date,
+                        help='first date (YYYY-MM-DD) of a backfill range; defaults to --window days before --end')
+    parser.add_argument('--end', type=parse_date,
+                        help='last date (YYYY-MM-DD) of a backfill range (default: today in --timezone)')
+    parser.add_argument('--window', type=int,
+                        help=f'number of days to build, ending at --end or starting at --start (default: {DEFAULT_WINDOW})')
+    parser.add_argument('--timezone', type=parse_timezone, default=timezone.utc,
+                        help='IANA timezone that decides the current date and post times (default: UTC)')
+    parser.add_argument('--expired', choices=('keep', 'prune'), default='keep',
+                        help='keep or delete generated files this build did not produce (default: %(default)s)')
+    parser.add_argument('--jobs', type=int, default=1,
+                        help='render daily pages on this many processes (default: %(default)s)')
+    parser.add_argument('--report', metavar='PATH',
+                        help='write a JSON build report with stage timings and counters')
+    parser.add_argument('--trace', metavar='PATH',
+                        help='write the stage timings as a Chrome trace (chrome://tracing, Perfetto)')
+    parser.add_argument('--profile', metavar='PATH',
+                        help='run the build under cProfile and dump the statistics to PATH')
+    parser.add_argument('--trace-memory', action='store_true',
+                        help='record peak traced memory in the build report (slows the build down)')
+    parser.add_argument('--next-featured', metavar='NAME',
+                        help='print the next date the named rock or mineral is featured, then exit')
+    args = parser.parse_args(argv)
+
+    if args.next_featured:
+        specimen = load_catalog().get(args.next_featured)
+        if specimen is None:
+            parser.error(f'no rock or mineral named {args.next_featured!r}')
+        date = next_featured_date(args.next_featured, today(args.timezone))
+        if date is None:
+            print(f"{specimen.name} joins the rotation after the next build")
+        else:
+            print(f"{specimen.name} is next featured on {date.strftime('%Y-%m-%d')}")
+        return
+
+    if args.images and not args.static:
+        parser.error('--images requires --static')
+
+    try:
+        dates = date_range(*resolve_window(args.start, args.end, args.window, today(args.timezone)))
+    except ValueError as e:
+        parser.error(f'invalid date range: {e}')
+
+    cache = None
+    if not args.no_cache:
+        cache = wiki_fetch.SummaryCache(args.cache_dir, ttl=args.cache_ttl * 3600)
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    report = BuildReport(trace=bool(args.trace), profile=bool(args.profile), memory=args.trace_memory)
+    build(args.base_url, out_dir=args.output_dir, incremental=args.incremental, static=args.static,
+          cache=cache, fetch_workers=args.fetch_workers, page_size=args.page_size,
+          dates=dates, jobs=args.jobs, images=args.images, image_cache_dir=args.image_cache_dir,
+          precompress=args.precompress, report=report, publish_timezone=args.timezone, expired=args.expired)
+    if args.report:
+        report.write_report(args.report)
+    if args.trace:
+        report.write_trace(args.trace)
+    if args.profile:
+        report.write_profile(args.profile)
+
+if __name__ == '__main__':
+    main()
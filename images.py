@@ -0,0 +1,186 @@
+"""
+Mirror specimen images locally as responsive, content-addressed variants
+Each source image is downloaded once into a cache keyed by its URL, then
+resized to a few widths and re-encoded as WebP (and AVIF where Pillow
+supports it) under img/ in the output directory
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+import hashlib
+import json
+import os
+import shutil
+import threading
+
+try:
+    from PIL import Image, ImageOps, features
+except ImportError:  # Pillow is optional; without it originals are mirrored as-is
+    Image = None
+
+import wiki_fetch
+
+WIDTHS = (320, 480, 800)
+IMAGE_DIR = 'img'
+CACHE_DIR = os.path.join('.cache', 'images')
+
+# The image box is at most the max-w-4xl column minus its padding
+SIZES = '(min-width: 56rem) 54rem, 100vw'
+
+CONTENT_TYPES = {'.jpg': 'image/jpeg', '.jpeg': 'image/jpeg', '.png': 'image/png',
+                 '.gif': 'image/gif', '.webp': 'image/webp', '.svg': 'image/svg+xml'}
+
+def available_formats():
+    """(extension, Pillow format, MIME type) of the variants this Pillow can write, best first"""
+    if Image is None:
+        return []
+    formats = []
+    if features.check('avif'):
+        formats.append(('avif', 'AVIF', 'image/avif'))
+    if features.check('webp'):
+        formats.append(('webp', 'WEBP', 'image/webp'))
+    return formats
+
+def source_extension(url):
+    """File extension of a source image, defaulting to .jpg"""
+    ext = os.path.splitext(urlsplit(url).path)[1].lower()
+    return ext if ext in CONTENT_TYPES else '.jpg'
+
+def atomic_write(path, data):
+    """Write bytes to path via a temporary file so readers never see partial files"""
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+class ImagePipeline:
+    """Downloads, caches and converts specimen images for the static pages
+
+    Originals are cached under cache_dir by the SHA-256 of their bytes, with
+    index.json mapping source URLs to digests so each URL is fetched once.
+    Outputs under out_dir/img/ are named after that digest, so a variant
+    that already exists is known to be current and is skipped.
+    """
+
+    def __init__(self, out_dir, base_url, cache_dir=CACHE_DIR, widths=WIDTHS,
+                 transport=None, timeout=30):
+        self.out_dir = out_dir
+        self.base_url = base_url
+        self.cache_dir = cache_dir
+        self.widths = widths
+        self.transport = transport or wiki_fetch.with_retries(wiki_fetch.KeepAliveTransport())
+        self.timeout = timeout
+        self.formats = available_formats()
+        self.lock = threading.Lock()
+        self.index_path = os.path.join(cache_dir, 'index.json')
+        try:
+            with open(self.index_path, encoding='utf-8') as f:
+                self.index = json.load(f)
+        except (OSError, ValueError):
+            self.index = {}
+        self.downloaded = self.generated = 0
+
+    def cached_original(self, url):
+        """Path of the cached original for a URL, downloading it if needed; None on failure"""
+        with self.lock:
+            entry = self.index.get(url)
+        if entry:
+            path = os.path.join(self.cache_dir, entry['sha256'] + entry['ext'])
+            if os.path.exists(path):
+                return path
+
+        try:
+            status, _, body = self.transport(url, {'User-Agent': wiki_fetch.USER_AGENT}, self.timeout)
+        except OSError:
+            return None
+        if status != 200 or not body:
+            return None
+
+        digest = hashlib.sha256(body).hexdigest()
+        ext = source_extension(url)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = os.path.join(self.cache_dir, digest + ext)
+        if not os.path.exists(path):
+            atomic_write(path, body)
+        with self.lock:
+            self.index[url] = {'sha256': digest, 'ext': ext}
+            self.downloaded += 1
+        return path
+
+    def output_path(self, name):
+        return os.path.join(self.out_dir, IMAGE_DIR, name)
+
+    def output_url(self, name):
+        return f'{self.base_url}/{IMAGE_DIR}/{name}'
+
+    def process(self, url, width=None, height=None):
+        """Mirror one image and return its responsive image description, or None
+
+        The description has the fallback src, its width and height, and a
+        list of {'type', 'srcset'} sources for a <picture> element. width and
+        height from the API are used when Pillow is unavailable.
+        """
+        original = self.cached_original(url)
+        if original is None:
+            return None
+        digest, ext = os.path.splitext(os.path.basename(original))
+        stem = digest[:16]
+
+        os.makedirs(os.path.join(self.out_dir, IMAGE_DIR), exist_ok=True)
+        fallback_name = stem + ext
+        if not os.path.exists(self.output_path(fallback_name)):
+            shutil.copyfile(original, self.output_path(fallback_name))
+
+        image = {'src': self.output_url(fallback_name), 'width': width, 'height': height,
+                 'sizes': SIZES, 'sources': []}
+        if not self.formats or ext == '.svg':
+            return image
+
+        try:
+            with Image.open(original) as source:
+                source = ImageOps.exif_transpose(source)
+                image['width'], image['height'] = source.size
+                targets = sorted({min(w, source.width) for w in self.widths})
+                for ext_name, pil_format, mime in self.formats:
+                    srcset = []
+                    for target in targets:
+                        name = f'{stem}-{target}.{ext_name}'
+                        if not os.path.exists(self.output_path(name)):
+                            self.write_variant(source, target, pil_format, self.output_path(name))
+                        srcset.append(f'{self.output_url(name)} {target}w')
+                    image['sources'].append({'type': mime, 'srcset': ', '.join(srcset)})
+        except OSError:
+            # Unreadable or unsupported source: serve the mirrored original only
+            image['sources'] = []
+        return image
+
+    def write_variant(self, source, target_width, pil_format, path):
+        """Resize and encode one variant"""
+        target_height = max(1, round(source.height * target_width / source.width))
+        resized = source.resize((target_width, target_height), Image.LANCZOS)
+        if resized.mode not in ('RGB', 'RGBA'):
+            resized = resized.convert('RGBA' if 'A' in resized.getbands() else 'RGB')
+        tmp_path = f'{path}.tmp'
+        resized.save(tmp_path, format=pil_format, quality=80)
+        os.replace(tmp_path, path)
+        with self.lock:
+            self.generated += 1
+
+    def process_all(self, thumbnails, max_workers=4):
+        """Process many images concurrently
+
+        thumbnails maps source URL to (width, height) as reported by the
+        API. Returns a dict of source URL to image description (or None).
+        """
+        urls = list(thumbnails)
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            results = pool.map(lambda url: self.process(url, *thumbnails[url]), urls)
+            images = dict(zip(urls, results))
+        self.save_index()
+        return images
+
+    def save_index(self):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with self.lock:
+            data = json.dumps(self.index, indent=2, sort_keys=True).encode('utf-8')
+        atomic_write(self.index_path, data)
@@ -0,0 +1,111 @@
+"""
+Build instrumentation
+Collects per-stage timings and counters while the site is generated, with
+optional cProfile and tracemalloc hooks, and writes them as a JSON build
+report and a Chrome trace (chrome://tracing, Perfetto)
+"""
+
+import contextlib
+import cProfile
+import json
+import os
+import threading
+import time
+import tracemalloc
+
+class BuildReport:
+    """Spans and counters of one build
+
+    Spans are always aggregated per name (count, total and maximum time);
+    individual events are only kept when trace=True, so instrumenting a
+    build of tens of thousands of pages costs no extra memory by default.
+    """
+
+    def __init__(self, trace=False, profile=False, memory=False):
+        self.started = time.perf_counter_ns()
+        self.started_at = time.time()
+        self.totals = {}
+        self.counters = {}
+        self.info = {}
+        self.events = [] if trace else None
+        self.profiler = cProfile.Profile() if profile else None
+        self.memory = memory
+        self.finished = None
+        if memory:
+            tracemalloc.start()
+        if self.profiler:
+            self.profiler.enable()
+
+    @contextlib.contextmanager
+    def span(self, name):
+        """Time the enclosed block under name; spans may nest"""
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.add_span(name, start, time.perf_counter_ns() - start)
+
+    def add_span(self, name, start, duration):
+        count, total, longest = self.totals.get(name, (0, 0, 0))
+        self.totals[name] = (count + 1, total + duration, max(longest, duration))
+        if self.events is not None:
+            self.events.append((name, start, duration, threading.get_ident()))
+
+    def timed(self, name, iterable):
+        """Yield from iterable, timing the production of each item as a span"""
+        iterator = iter(iterable)
+        while True:
+            start = time.perf_counter_ns()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            self.add_span(name, start, time.perf_counter_ns() - start)
+            yield item
+
+    def count(self, name, amount=1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def finish(self):
+        """Stop the clock and the optional profiler and memory tracing"""
+        if self.finished is not None:
+            return
+        self.finished = time.perf_counter_ns()
+        if self.profiler:
+            self.profiler.disable()
+        if self.memory:
+            self.info['peak_traced_bytes'] = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+    def as_dict(self):
+        self.finish()
+        return {
+            'started_at': self.started_at,
+            'wall_ms': round((self.finished - self.started) / 1e6, 3),
+            'spans': {name: {'count': count, 'total_ms': round(total / 1e6, 3), 'max_ms': round(longest / 1e6, 3)}
+                      for name, (count, total, longest) in self.totals.items()},
+            'counters': dict(sorted(self.counters.items())),
+            'info': self.info,
+        }
+
+    def write_report(self, path):
+        """Write the JSON build report"""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.as_dict(), f, indent=2)
+            f.write('\n')
+
+    def write_trace(self, path):
+        """Write the recorded spans in the Chrome trace event format"""
+        self.finish()
+        pid = os.getpid()
+        events = [{'name': name, 'ph': 'X', 'ts': (start - self.started) / 1000, 'dur': duration / 1000,
+                   'pid': pid, 'tid': tid} for name, start, duration, tid in self.events or ()]
+        events.extend({'name': name, 'ph': 'C', 'ts': (self.finished - self.started) / 1000, 'pid': pid,
+                       'args': {name: value}} for name, value in self.counters.items())
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+
+    def write_profile(self, path):
+        """Dump the cProfile statistics, for pstats or snakeviz"""
+        self.finish()
+        self.profiler.dump_stats(path)
@@ -0,0 +1,324 @@
+"""
+Local preview server
+Renders pages, feeds and the search index on demand from memory, keeps the
+responses in an LRU cache with ETags, and watches the templates, static
+assets, catalog and sources to invalidate only the entries they affect
+"""
+
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+import argparse
+import hashlib
+import importlib
+import io
+import os
+import re
+import threading
+import traceback
+
+import catalog
+import feeds
+import generate_feed
+import images
+import publish
+import search
+import templating
+import wiki_fetch
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+CACHE_SIZE = 256
+POLL_INTERVAL = 0.25
+
+# Reloaded in this order when a Python source changes, dependencies first
+MODULES = (templating, catalog, wiki_fetch, feeds, search, publish, images, generate_feed)
+
+DAILY_PAGE = re.compile(r'(\d{4}-\d{2}-\d{2})\.html')
+SUBSCRIPTION_FEEDS = ('feed.xml', 'atom.xml', 'feed.json')
+FEED_DEPS = ('templates/feed_description.html', 'specimens.jsonl')
+LISTING_TEMPLATES = ('templates/listing.html', 'templates/post_summary.html', 'templates/month_summary.html')
+CONTENT_TYPES = {
+    '.html': 'text/html; charset=utf-8',
+    '.xml': 'application/xml; charset=utf-8',
+    '.json': 'application/json',
+    '.css': 'text/css; charset=utf-8',
+    '.js': 'text/javascript; charset=utf-8',
+}
+
+def relative(path):
+    """Path relative to the repository root, with forward slashes"""
+    return os.path.relpath(path, ROOT).replace(os.sep, '/')
+
+def watched_files():
+    """Sources whose changes the preview reacts to, relative to the repository root"""
+    for directory, extensions in (('.', ('.py', '.jsonl', 'schedule.json')), ('templates', ('.html',)), ('static', ('.css', '.js'))):
+        for name in os.listdir(os.path.join(ROOT, directory)):
+            if name.endswith(extensions):
+                yield relative(os.path.join(ROOT, directory, name))
+
+def catalog_snapshot():
+    """Map each specimen name to its (category, index) slot and content"""
+    return {s.name: ((s.category, s.index), (tuple(s.tags), s.desc)) for s in catalog.load_catalog().specimens}
+
+class Preview:
+    """Renders responses on demand and caches them with their dependencies
+
+    Every cache entry lists the files (e.g. templates/daily.html) and
+    specimens (specimen:Granite) it was rendered from, so a change only
+    evicts the entries that depend on it.
+    """
+
+    def __init__(self, base_url, dates, static=False, cache=None, page_size=generate_feed.INDEX_PAGE_SIZE,
+                 max_entries=CACHE_SIZE, publish_timezone=None):
+        self.base_url = base_url
+        self.dates = dates
+        self.static = static
+        self.cache = cache
+        self.page_size = page_size
+        self.publish_timezone = publish_timezone or generate_feed.timezone.utc
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.generation = 0
+        self.hits = self.misses = 0
+        self.specimens = catalog_snapshot()
+
+    def posts(self):
+        """Every published post up to the newest date, newest first, as a build lists them"""
+        published = max(generate_feed.today(self.publish_timezone), max(self.dates))
+        history = generate_feed.date_range(*generate_feed.history_range(published))
+        return [(date,) + generate_feed.get_specimens_for_date(date) for date in history]
+
+    def get(self, path):
+        """Return (body, content_type, etag) for a URL path, or None if nothing is served there"""
+        if path.endswith('/'):
+            path += 'index.html'
+        with self.lock:
+            if path in self.entries:
+                self.entries.move_to_end(path)
+                self.hits += 1
+                return self.entries[path][:3]
+            self.misses += 1
+            generation = self.generation
+
+        responses = {}
+        for key, (body, deps) in self.render(path.lstrip('/')).items():
+            body = body.encode('utf-8') if isinstance(body, str) else body
+            etag = f'"{hashlib.sha256(body).hexdigest()[:20]}"'
+            content_type = CONTENT_TYPES.get(os.path.splitext(key)[1], 'application/octet-stream')
+            responses[f'/{key}'] = (body, content_type, etag, frozenset(deps))
+
+        with self.lock:
+            # Entries rendered before an invalidation may already be stale
+            if generation == self.generation:
+                for key, entry in responses.items():
+                    self.entries[key] = entry
+                    self.entries.move_to_end(key)
+                while len(self.entries) > self.max_entries:
+                    self.entries.popitem(last=False)
+        response = responses.get(path)
+        return response[:3] if response else None
+
+    def render(self, name):
+        """Render the response for name along with its siblings, as {name: (body, deps)}"""
+        match = DAILY_PAGE.fullmatch(name)
+        if match:
+            try:
+                date = generate_feed.parse_date(match.group(1))
+            except argparse.ArgumentTypeError:
+                return {}
+            return {name: self.render_daily_page(date)}
+        if name == 'index.html' or name.startswith(('page/', 'archive/')):
+            posts = self.posts()
+            deps = LISTING_TEMPLATES + ('specimens.jsonl', 'static/style.css', 'static/search.js')
+            return {filename: (html, deps) for filename, html
+                    in generate_feed.generate_index_pages(posts, self.base_url, self.page_size)}
+        if name in SUBSCRIPTION_FEEDS or name.startswith('feeds/'):
+            return self.render_feeds()
+        if name.startswith(f'{search.SEARCH_DIR}/'):
+            return {filename: (data, ('specimens.jsonl',))
+                    for filename, data in search.generate_search_index(self.posts())}
+        for asset in generate_feed.ASSET_NAMES:
+            if name == generate_feed.asset_path(asset):
+                with open(os.path.join(generate_feed.STATIC_DIR, asset), 'rb') as f:
+                    return {name: (f.read(), (f'static/{asset}',))}
+        return {}
+
+    def render_daily_page(self, date):
+        rock, mineral = generate_feed.get_specimens_for_date(date)
+        deps = [f"specimen:{rock['name']}", f"specimen:{mineral['name']}"]
+        if not self.static:
+            html = generate_feed.create_daily_page(date, rock, mineral, self.base_url)
+            return html, deps + ['templates/daily.html']
+        summaries = wiki_fetch.fetch_summaries([(s['name'], s['desc']) for s in (rock, mineral)], cache=self.cache)
+        html = generate_feed.create_static_daily_page(date, summaries[rock['name']], summaries[mineral['name']],
+                                                      self.base_url)
+        return html, deps + ['templates/daily_static.html', 'templates/specimen_card.html', 'static/style.css']
+
+    def render_feeds(self):
+        """Render every feed a build writes, through the same render_feeds, into memory"""
+        rendered = generate_feed.render_feeds(self.posts(), self.base_url,
+                                              begin=lambda filename: io.StringIO(),
+                                              finish=lambda filename, f: f.getvalue(),
+                                              publish_timezone=self.publish_timezone)
+        return {filename: (body, FEED_DEPS) for filename, body in rendered}
+
+    def invalidate(self, changed):
+        """Drop the cache entries affected by the changed files; returns how many were dropped"""
+        changed = set(changed)
+        if any(path.endswith('.py') for path in changed):
+            for module in MODULES:
+                importlib.reload(module)
+            self.specimens = catalog_snapshot()
+            return self.clear()
+
+        if 'schedule.json' in changed:
+            generate_feed.load_schedule_eras.cache_clear()
+            catalog.load_catalog.cache_clear()
+            self.specimens = catalog_snapshot()
+            return self.clear()
+
+        deps = set(changed)
+        if 'specimens.jsonl' in changed:
+            catalog.load_catalog.cache_clear()
+            snapshot = catalog_snapshot()
+            slots = {name: slot for name, (slot, _) in snapshot.items()}
+            if slots != {name: slot for name, (slot, _) in self.specimens.items()}:
+                # Specimens were added, removed or reordered, which shifts their indexes
+                self.specimens = snapshot
+                return self.clear()
+            deps.update(f'specimen:{name}' for name in snapshot if snapshot[name] != self.specimens[name])
+            self.specimens = snapshot
+        if any(path.startswith('templates/') for path in changed):
+            templating.load_template.cache_clear()
+        if any(path.startswith('static/') for path in changed):
+            generate_feed.asset_path.cache_clear()
+
+        with self.lock:
+            self.generation += 1
+            stale = [path for path, entry in self.entries.items() if entry[3] & deps]
+            for path in stale:
+                del self.entries[path]
+        return len(stale)
+
+    def clear(self):
+        with self.lock:
+            self.generation += 1
+            dropped = len(self.entries)
+            self.entries.clear()
+        return dropped
+
+    def watch(self, stop, interval=POLL_INTERVAL):
+        """Poll the watched files until stop is set, invalidating entries as they change"""
+        def scan():
+            mtimes = {}
+            for path in watched_files():
+                try:
+                    mtimes[path] = os.stat(os.path.join(ROOT, path)).st_mtime_ns
+                except OSError:
+                    pass
+            return mtimes
+
+        mtimes = scan()
+        while not stop.wait(interval):
+            current = scan()
+            changed = sorted(path for path in current.keys() | mtimes.keys() if current.get(path) != mtimes.get(path))
+            mtimes = current
+            if changed:
+                try:
+                    dropped = self.invalidate(changed)
+                except Exception:
+                    traceback.print_exc()
+                    dropped = self.clear()
+                print(f"Changed {', '.join(changed)}: {dropped} cached responses invalidated")
+
+class PreviewHandler(BaseHTTPRequestHandler):
+    """Serves GET and HEAD requests from the server's Preview, answering 304 for matching ETags"""
+
+    def do_GET(self):
+        self.respond(include_body=True)
+
+    def do_HEAD(self):
+        self.respond(include_body=False)
+
+    def respond(self, include_body):
+        try:
+            response = self.server.preview.get(urlsplit(self.path).path)
+        except Exception:
+            body = traceback.format_exc().encode('utf-8')
+            self.send_response(500)
+            self.send_header('Content-Type', 'text/plain; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            if include_body:
+                self.wfile.write(body)
+            return
+        if response is None:
+            self.send_error(404)
+            return
+
+        body, content_type, etag = response
+        if etag in self.headers.get('If-None-Match', ''):
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', etag)
+        self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        if include_body:
+            self.wfile.write(body)
+
+def serve(preview, host='127.0.0.1', port=8000):
+    """Serve preview on a threaded HTTP server until interrupted"""
+    server = ThreadingHTTPServer((host, port), PreviewHandler)
+    server.preview = preview
+    stop = threading.Event()
+    watcher = threading.Thread(target=preview.watch, args=(stop,), daemon=True)
+    watcher.start()
+    print(f"Previewing {len(preview.dates)} days at {preview.base_url}/ (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop.set()
+        server.server_close()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='generate_feed.py serve',
+                                     description='Preview the site locally, re-rendering pages as sources change')
+    parser.add_argument('--host', default='127.0.0.1', help='interface to listen on (default: %(default)s)')
+    parser.add_argument('--port', type=int, default=8000, help='port to listen on (default: %(default)s)')
+    parser.add_argument('--static', action='store_true',
+                        help='preview pre-rendered daily pages with Wikipedia content fetched on demand')
+    parser.add_argument('--page-size', type=generate_feed.parse_positive_int, default=generate_feed.INDEX_PAGE_SIZE,
+                        help='posts per page of the paginated index (default: %(default)s)')
+    parser.add_argument('--cache-dir', default=wiki_fetch.CACHE_DIR,
+                        help='where fetched Wikipedia content is cached (default: %(default)s)')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='always fetch Wikipedia content instead of using the cache')
+    parser.add_argument('--start', type=generate_feed.parse_date,
+                        help='first date (YYYY-MM-DD) listed; defaults to --window days before --end')
+    parser.add_argument('--end', type=generate_feed.parse_date,
+                        help='last date (YYYY-MM-DD) listed (default: today in --timezone)')
+    parser.add_argument('--window', type=int,
+                        help=f'number of days listed (default: {generate_feed.DEFAULT_WINDOW})')
+    parser.add_argument('--timezone', type=generate_feed.parse_timezone, default=generate_feed.timezone.utc,
+                        help='IANA timezone that decides the current date and post times (default: UTC)')
+    args = parser.parse_args(argv)
+
+    try:
+        start, end = generate_feed.resolve_window(args.start, args.end, args.window,
+                                                  generate_feed.today(args.timezone))
+    except ValueError as e:
+        parser.error(f'invalid date range: {e}')
+
+    cache = None if args.no_cache else wiki_fetch.SummaryCache(args.cache_dir)
+    preview = Preview(f'http://{args.host}:{args.port}', generate_feed.date_range(start, end),
+                      static=args.static, cache=cache, page_size=args.page_size,
+                      publish_timezone=args.timezone)
+    serve(preview, args.host, args.port)
@@ -0,0 +1,105 @@
+"""
+Prepare generated files for static hosting
+Publishes shared assets under content-hashed names, writes gzip and brotli
+siblings next to text outputs, and emits cache headers with ETags
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import gzip
+import hashlib
+import json
+import os
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; without it only .gz siblings are written
+    brotli = None
+
+ASSET_DIR = 'assets'
+HEADERS_NAME = '_headers'
+ASSET_MANIFEST_NAME = 'asset-manifest.json'
+
+COMPRESSIBLE = {'.html', '.xml', '.css', '.js', '.json', '.svg', '.txt'}
+IMMUTABLE_CACHE = 'public, max-age=31536000, immutable'
+REVALIDATE_CACHE = 'public, max-age=0, must-revalidate'
+
+def hashed_asset_name(name, data):
+    """Path under assets/ that embeds a hash of the content, e.g. assets/style.3f2a9c1b7e.css"""
+    stem, ext = os.path.splitext(os.path.basename(name))
+    return f'{ASSET_DIR}/{stem}.{hashlib.sha256(data).hexdigest()[:10]}{ext}'
+
+def is_stale(source, target):
+    """True if target is missing or older than source"""
+    try:
+        return os.path.getmtime(target) < os.path.getmtime(source)
+    except OSError:
+        return True
+
+def compress_file(path):
+    """Write path.gz (and path.br when brotli is available) at maximum compression
+
+    Returns the encodings written. gzip output carries no timestamp, so
+    unchanged inputs give byte-identical siblings.
+    """
+    written = []
+    data = None
+    if is_stale(path, f'{path}.gz'):
+        with open(path, 'rb') as f:
+            data = f.read()
+        with open(f'{path}.gz', 'wb') as f:
+            f.write(gzip.compress(data, compresslevel=9, mtime=0))
+        written.append('gzip')
+    if brotli is not None and is_stale(path, f'{path}.br'):
+        if data is None:
+            with open(path, 'rb') as f:
+                data = f.read()
+        with open(f'{path}.br', 'wb') as f:
+            f.write(brotli.compress(data, quality=11))
+        written.append('br')
+    return written
+
+def precompress(out_dir, filenames, max_workers=None):
+    """Compress every compressible file in parallel, skipping up-to-date siblings
+
+    zlib and brotli release the GIL, so threads give real parallelism.
+    Returns the number of sibling files written.
+    """
+    paths = [os.path.join(out_dir, name) for name in filenames
+             if os.path.splitext(name)[1] in COMPRESSIBLE]
+    with ThreadPoolExecutor(max_workers=max_workers or os.cpu_count()) as pool:
+        return sum(len(written) for written in pool.map(compress_file, paths))
+
+def file_etag(path):
+    """Strong ETag derived from a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            digest.update(chunk)
+    return f'"{digest.hexdigest()[:20]}"'
+
+def write_cache_manifests(out_dir, filenames, assets):
+    """Write asset-manifest.json and a _headers file for hosts that honour it
+
+    assets maps logical asset names (style.css) to their current hashed
+    paths. Everything under assets/, including older hashed files that
+    earlier pages still link to, is cached for a year as immutable;
+    everything else must revalidate, which its ETag makes a cheap 304.
+    """
+    files = {}
+    headers = []
+    for name in sorted(set(filenames)):
+        path = os.path.join(out_dir, name)
+        if not os.path.exists(path):
+            continue
+        etag = file_etag(path)
+        cache_control = IMMUTABLE_CACHE if name.startswith(f'{ASSET_DIR}/') else REVALIDATE_CACHE
+        encodings = [enc for enc, ext in (('br', '.br'), ('gzip', '.gz')) if os.path.exists(f'{path}{ext}')]
+        files[name] = {'etag': etag, 'size': os.path.getsize(path),
+                       'cache_control': cache_control, 'encodings': encodings}
+        headers.append(f'/{name}\n  Cache-Control: {cache_control}\n  ETag: {etag}\n')
+
+    with open(os.path.join(out_dir, ASSET_MANIFEST_NAME), 'w', encoding='utf-8') as f:
+        json.dump({'assets': assets, 'files': files}, f, indent=2, sort_keys=True)
+        f.write('\n')
+    with open(os.path.join(out_dir, HEADERS_NAME), 'w', encoding='utf-8') as f:
+        f.write('\n'.join(headers))
@@ -0,0 +1,66 @@
+"""
+Prebuilt client-side search index
+Specimen names, tags and curated descriptions are split into terms and
+sharded by their first character, so static/search.js only fetches the
+shards for what is typed and answers queries without a server
+"""
+
+from datetime import date as Date
+import json
+import re
+
+SEARCH_DIR = 'search'
+
+# Dates are stored as days since the Unix epoch, which JavaScript turns
+# back into dates with new Date(day * 86400000)
+UNIX_EPOCH = Date(1970, 1, 1).toordinal()
+
+STOP_WORDS = frozenset([
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'in', 'is',
+    'it', 'its', 'of', 'on', 'or', 'that', 'the', 'to', 'with',
+])
+
+def terms(text):
+    """Lowercase search terms of a text, without stop words and single characters"""
+    return [term for term in re.findall(r'[a-z0-9]+', text.casefold())
+            if len(term) > 1 and term not in STOP_WORDS]
+
+def dumps(data):
+    """Compact, deterministic JSON so unchanged indexes keep their bytes"""
+    return json.dumps(data, separators=(',', ':'), sort_keys=True, ensure_ascii=False)
+
+def generate_search_index(dates_and_specimens):
+    """Yield (filename, json) for the search index of the given posts
+
+    search/specimens.json lists every featured specimen as
+    {"n": name, "c": category, "d": days}, where days are the dates it was
+    featured, ascending and delta-encoded. Each search/<x>.json shard maps
+    the terms starting with x to the ids (list positions) of the
+    specimens they occur in.
+    """
+    ids = {}
+    specimens = []
+    days = []
+    for date, rock, mineral in dates_and_specimens:
+        for specimen in (rock, mineral):
+            if specimen['name'] not in ids:
+                ids[specimen['name']] = len(specimens)
+                specimens.append(specimen)
+                days.append([])
+            days[ids[specimen['name']]].append(date.toordinal() - UNIX_EPOCH)
+
+    shards = {}
+    for specimen_id, specimen in enumerate(specimens):
+        text = ' '.join([specimen['name'], ' '.join(specimen['tags']), specimen['desc']])
+        for term in set(terms(text)):
+            shards.setdefault(term[0], {}).setdefault(term, []).append(specimen_id)
+
+    entries = []
+    for specimen, featured in zip(specimens, days):
+        featured.sort()
+        deltas = [day - previous for previous, day in zip([0] + featured, featured)]
+        entries.append({'n': specimen['name'], 'c': specimen['category'], 'd': deltas})
+    yield f'{SEARCH_DIR}/specimens.json', dumps({'specimens': entries, 'stop': sorted(STOP_WORDS)})
+
+    for key in sorted(shards):
+        yield f'{SEARCH_DIR}/{key}.json', dumps(shards[key])
@@ -0,0 +1,98 @@
+// Search box for the listing pages, backed by the index that search.py
+// writes under search/. Term shards are fetched on first use and cached.
+(function () {
+    const form = document.getElementById('search');
+    if (!form || !window.fetch) return;
+
+    const base = form.dataset.base;
+    const input = form.querySelector('input');
+    const results = document.getElementById('search-results');
+    const shards = {};
+    const MAX_RESULTS = 30;
+    let latest = 0;
+
+    function load(name) {
+        if (!shards[name]) {
+            shards[name] = fetch(`${base}/search/${name}.json`).then(r => (r.ok ? r.json() : {}));
+        }
+        return shards[name];
+    }
+
+    // posts: [{day, names: [rock, mineral]}], newest first
+    let posts = null;
+    async function index() {
+        const data = await load('specimens');
+        if (!posts) {
+            const byDay = new Map();
+            data.specimens.forEach((specimen, id) => {
+                let day = 0;
+                for (const delta of specimen.d) {
+                    day += delta;
+                    if (!byDay.has(day)) byDay.set(day, []);
+                    byDay.get(day)[specimen.c === 'rock' ? 0 : 1] = id;
+                }
+            });
+            posts = [...byDay.entries()].sort((a, b) => b[0] - a[0]).map(([day, ids]) => ({day, ids}));
+        }
+        return data;
+    }
+
+    function isoDate(day) {
+        return new Date(day * 86400000).toISOString().slice(0, 10);
+    }
+
+    // One set of specimen ids per word, holding the specimens with a term
+    // that starts with it
+    function matchingSpecimens(words) {
+        return Promise.all(words.map(async word => {
+            const shard = await load(word[0]);
+            const ids = new Set();
+            for (const term in shard) {
+                if (term.startsWith(word)) shard[term].forEach(id => ids.add(id));
+            }
+            return ids;
+        }));
+    }
+
+    async function search(query) {
+        const data = await index();
+        query = query.trim().toLowerCase();
+        if (/^\d{4}(-\d{0,2}){0,2}$/.test(query)) {
+            return posts.filter(post => isoDate(post.day).startsWith(query));
+        }
+        const stop = new Set(data.stop);
+        const words = (query.match(/[a-z0-9]+/g) || []).filter(w => w.length > 1 && !stop.has(w));
+        if (!words.length) return [];
+        const matches = await matchingSpecimens(words);
+        return posts.filter(post => matches.every(ids => post.ids.some(id => ids.has(id))));
+    }
+
+    function render(found, data) {
+        results.replaceChildren();
+        for (const post of found.slice(0, MAX_RESULTS)) {
+            const date = isoDate(post.day);
+            const names = post.ids.map(id => data.specimens[id].n).join(' & ');
+            const link = document.createElement('a');
+            link.href = `${base}/${date}.html`;
+            link.className = 'text-cyan-400 hover:text-cyan-300';
+            link.textContent = `${date} · ${names}`;
+            const item = document.createElement('li');
+            item.append(link);
+            results.append(item);
+        }
+        if (!found.length && input.value.trim()) {
+            const item = document.createElement('li');
+            item.className = 'text-slate-400';
+            item.textContent = 'No matching posts';
+            results.append(item);
+        }
+    }
+
+    input.addEventListener('input', async () => {
+        const request = ++latest;
+        const found = await search(input.value);
+        if (request === latest) render(found, await index());
+    });
+    form.addEventListener('submit', event => event.preventDefault());
+    form.hidden = false;
+})();
@@ -0,0 +1,105 @@
+"""
+Minimal precompiled templates for the generated pages
+A template is compiled once into its constant text segments and a list of
+slots; rendering fills the slots with escaped values and joins the parts
+"""
+
+from urllib.parse import quote
+import functools
+import hashlib
+import json
+import os
+import re
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'templates')
+
+# {{ name }} or {{ name|filter }}
+SLOT_PATTERN = re.compile(r'\{\{\s*(\w+)\s*(?:\|\s*(\w+)\s*)?\}\}')
+
+def escape_html(value):
+    """Escape text content of an HTML element"""
+    return str(value).replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+
+def escape_attr(value):
+    """Escape a value for a quoted HTML attribute"""
+    return escape_html(value).replace('"', '&quot;').replace("'", '&#x27;')
+
+def escape_js(value):
+    """Encode a value as a JavaScript string literal, safe inside a <script> block"""
+    return (json.dumps(str(value), ensure_ascii=False)
+            .replace('<', '\\u003c').replace('>', '\\u003e').replace('&', '\\u0026')
+            .replace('\u2028', '\\u2028').replace('\u2029', '\\u2029'))
+
+def escape_xml(value):
+    """Escape XML character data"""
+    return escape_html(value)
+
+def escape_xml_attr(value):
+    """Escape a value for a double-quoted XML attribute"""
+    return escape_html(value).replace('"', '&quot;')
+
+def escape_url(value):
+    """Percent-encode a value for use as a URL path segment"""
+    return quote(str(value))
+
+FILTERS = {
+    'html': escape_html,
+    'attr': escape_attr,
+    'js': escape_js,
+    'xml': escape_xml,
+    'url': escape_url,
+    'raw': str,
+}
+
+class Template:
+    """A template compiled into constant segments and escaped slots
+
+    Slots are written {{ name|filter }}, where filter picks the escaping for
+    the context the value lands in: html (element text), attr, js (string
+    literal), xml, url, or raw for markup that is already rendered. Without
+    a filter, html is used.
+    """
+
+    def __init__(self, source, name='<string>'):
+        self.name = name
+        self.parts = []
+        self.slots = []
+        position = 0
+        for match in SLOT_PATTERN.finditer(source):
+            self.parts.append(source[position:match.start()])
+            slot_name, filter_name = match.group(1), match.group(2) or 'html'
+            if filter_name not in FILTERS:
+                raise ValueError(f'{name}: unknown filter {filter_name!r} for slot {slot_name!r}')
+            self.slots.append((len(self.parts), slot_name, FILTERS[filter_name]))
+            self.parts.append(None)
+            position = match.end()
+        self.parts.append(source[position:])
+
+    def render(self, **values):
+        """Fill every slot from values and return the joined text"""
+        parts = self.parts.copy()
+        for index, slot_name, escape in self.slots:
+            try:
+                parts[index] = escape(values[slot_name])
+            except KeyError:
+                raise KeyError(f'{self.name}: missing value for slot {slot_name!r}') from None
+        return ''.join(parts)
+
+@functools.lru_cache(maxsize=None)
+def load_template(name):
+    """Read and compile a template from the templates directory, once per process"""
+    with open(os.path.join(TEMPLATE_DIR, name), encoding='utf-8') as f:
+        source = f.read()
+    # Template files end with a newline that is not part of the output
+    if source.endswith('\n'):
+        source = source[:-1]
+    return Template(source, name)
+
+def templates_fingerprint():
+    """Short hash over all template sources, changing whenever any template does"""
+    digest = hashlib.sha256()
+    for name in sorted(os.listdir(TEMPLATE_DIR)):
+        digest.update(name.encode('utf-8'))
+        with open(os.path.join(TEMPLATE_DIR, name), 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:12]
@@ -0,0 +1,211 @@
+"""
+Tests for the Wikipedia summary cache and the image pipeline
+Both run against a local stub server on 127.0.0.1, reached through the
+same transports a build uses, so no test touches the network
+"""
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+import io
+import json
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+import images
+import wiki_fetch
+
+LAST_MODIFIED = 'Mon, 19 Oct 2026 06:00:00 GMT'
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Answers MediaWiki queries and image downloads from the server's state"""
+
+    def do_GET(self):
+        server = self.server
+        server.requests.append((self.path, dict(self.headers)))
+        parts = urlsplit(self.path)
+        if parts.path.startswith('/img/'):
+            body = server.files.get(parts.path)
+            self.reply(200 if body else 404, body or b'')
+        elif server.mode == 'down':
+            self.reply(503, b'')
+        elif server.mode == 'error':
+            self.reply(200, json.dumps({'error': {'code': 'maxlag'}}).encode())
+        elif self.headers.get('If-Modified-Since') and not server.changed:
+            self.reply(304, b'')
+        else:
+            titles = parse_qs(parts.query)['titles'][0].split('|')
+            self.reply(200, json.dumps(server.query(titles)).encode(), {'Last-Modified': LAST_MODIFIED})
+
+    def reply(self, status, body, headers=None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+class StubServer(ThreadingHTTPServer):
+    """Stub of the Wikipedia API and image host; redirects maps title to target"""
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), StubHandler)
+        self.requests = []
+        self.mode = 'ok'
+        self.changed = False
+        self.redirects = {}
+        self.files = {}
+        self.url = f'http://127.0.0.1:{self.server_address[1]}'
+
+    def query(self, titles):
+        redirects = [{'from': title, 'to': self.redirects[title]} for title in titles if title in self.redirects]
+        pages = {}
+        for index, title in enumerate(titles):
+            final = self.redirects.get(title, title)
+            pages[str(index)] = {'title': final, 'extract': f'About {final}'}
+        return {'query': {'redirects': redirects, 'pages': pages}}
+
+    def transport(self):
+        """A build's transport, with API requests sent here instead"""
+        transport = wiki_fetch.with_retries(wiki_fetch.KeepAliveTransport(), sleep=lambda seconds: None)
+        return lambda url, headers, timeout: transport(url.replace(wiki_fetch.API_URL, f'{self.url}/api'),
+                                                       headers, timeout)
+
+class StubTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.server = StubServer()
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+class SummaryCacheTest(StubTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.now = 1000.0
+        self.cache = wiki_fetch.SummaryCache(self.directory, ttl=60, clock=lambda: self.now)
+        self.specimens = [(f'Specimen {i}', f'Curated {i}') for i in range(25)]
+
+    def fetch(self, specimens=None):
+        return wiki_fetch.fetch_summaries(specimens or self.specimens, cache=self.cache,
+                                          transport=self.server.transport())
+
+    def test_fresh_entries_need_no_requests(self):
+        summaries = self.fetch()
+        self.assertEqual(len(self.server.requests), 2)
+        self.assertEqual(summaries['Specimen 3']['extract'], 'About Specimen 3')
+        self.assertEqual(self.fetch(), summaries)
+        self.assertEqual(len(self.server.requests), 2)
+        self.assertEqual(self.cache.hits, 25)
+
+    def test_expired_entries_are_revalidated_in_batches(self):
+        summaries = self.fetch()
+        self.now += 120
+        self.assertEqual(self.fetch(), summaries)
+        conditional = [headers.get('If-Modified-Since') for _, headers in self.server.requests[2:]]
+        self.assertEqual(conditional, [LAST_MODIFIED, LAST_MODIFIED])
+        self.assertEqual(self.cache.revalidated, 25)
+        self.assertEqual(self.cache.fetched, 25)
+        # Renewed entries are fresh again
+        self.fetch()
+        self.assertEqual(len(self.server.requests), 4)
+
+    def test_changed_batches_are_fetched_again(self):
+        self.fetch()
+        self.now += 120
+        self.server.changed = True
+        self.fetch()
+        self.assertEqual(len(self.server.requests), 4)
+        self.assertEqual(self.cache.revalidated, 0)
+        self.assertEqual(self.cache.fetched, 50)
+
+    def test_offline_serves_stale_entries_then_curated_descriptions(self):
+        self.fetch(self.specimens[:1])
+        self.now += 120
+        self.server.mode = 'down'
+        summaries = self.fetch(self.specimens[:2])
+        self.assertEqual(summaries['Specimen 0']['extract'], 'About Specimen 0')
+        self.assertEqual(summaries['Specimen 1']['extract'], 'Curated 1')
+        self.assertEqual(self.cache.offline, 1)
+
+    def test_api_errors_are_not_cached(self):
+        self.server.mode = 'error'
+        summaries = self.fetch(self.specimens[:1])
+        self.assertEqual(summaries['Specimen 0']['extract'], 'Curated 0')
+        self.assertEqual(self.cache.fetched, 0)
+        self.assertIsNone(self.cache.fresh('Specimen 0'))
+
+    def test_redirects_map_back_to_requested_titles(self):
+        self.server.redirects = {'Mica': 'Mica group'}
+        summaries = self.fetch([('Mica', 'Curated mica'), ('Quartz', 'Curated quartz')])
+        self.assertEqual(summaries['Mica']['title'], 'Mica group')
+        self.assertEqual(summaries['Mica']['url'], wiki_fetch.article_url('Mica'))
+        self.assertEqual(summaries['Quartz']['extract'], 'About Quartz')
+
+    def test_least_recently_used_entries_are_evicted(self):
+        cache = wiki_fetch.SummaryCache(self.directory, max_entries=2)
+        for age, name in enumerate(['Granite', 'Basalt']):
+            cache.put(name, {'title': name})
+            os.utime(cache.path(name), (age, age))
+        cache.put('Quartz', {'title': 'Quartz'})
+        self.assertIsNone(cache.load('Granite'))
+        self.assertIsNotNone(cache.load('Basalt'))
+        self.assertIsNotNone(cache.load('Quartz'))
+
+class ImagePipelineTest(StubTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.out_dir = os.path.join(self.directory, 'out')
+        self.cache_dir = os.path.join(self.directory, 'cache')
+        self.server.files['/img/granite.png'] = png_bytes() if images.Image else b'not really a png'
+
+    def pipeline(self):
+        return images.ImagePipeline(self.out_dir, 'https://example.test', cache_dir=self.cache_dir,
+                                    transport=wiki_fetch.KeepAliveTransport())
+
+    def test_originals_are_downloaded_once(self):
+        url = f'{self.server.url}/img/granite.png'
+        first = self.pipeline()
+        image = first.process_all({url: (400, 300)})[url]
+        self.assertEqual(first.downloaded, 1)
+        self.assertTrue(image['src'].startswith('https://example.test/img/'))
+        self.assertTrue(os.path.exists(os.path.join(self.out_dir, 'img', os.path.basename(image['src']))))
+
+        second = self.pipeline()
+        self.assertEqual(second.process_all({url: (400, 300)})[url], image)
+        self.assertEqual(second.downloaded, 0)
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_failed_downloads_give_no_image(self):
+        pipeline = self.pipeline()
+        self.assertIsNone(pipeline.process(f'{self.server.url}/img/missing.png'))
+        self.assertEqual(pipeline.downloaded, 0)
+
+    @unittest.skipUnless(images.available_formats(), 'needs Pillow with WebP or AVIF support')
+    def test_existing_variants_are_skipped(self):
+        url = f'{self.server.url}/img/granite.png'
+        first = self.pipeline()
+        image = first.process(url)
+        self.assertGreater(first.generated, 0)
+        self.assertTrue(image['sources'])
+        second = self.pipeline()
+        self.assertEqual(second.process(url), image)
+        self.assertEqual(second.generated, 0)
+
+def png_bytes():
+    """A small PNG, when Pillow is available to make one"""
+    out = io.BytesIO()
+    images.Image.new('RGB', (600, 400), 'gray').save(out, format='PNG')
+    return out.getvalue()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,351 @@
+"""
+Fetch specimen summaries from the Wikipedia API at build time
+Mirrors the fetchData logic the daily pages used to run in the browser,
+with an on-disk cache so warm rebuilds never touch the network
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+from http.client import HTTPConnection, HTTPException, HTTPSConnection
+from urllib.error import HTTPError
+from urllib.parse import quote, urlencode, urlsplit
+from urllib.request import Request, urlopen
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+
+API_URL = 'https://en.wikipedia.org/w/api.php'
+USER_AGENT = 'rockandminotd/1.0 (https://github.com/UnlikelyRock13/rockandminotd)'
+
+CACHE_DIR = os.path.join('.cache', 'wikipedia')
+DEFAULT_TTL = 7 * 24 * 3600
+DEFAULT_MAX_ENTRIES = 1000
+
+# TextExtracts returns at most 20 intro extracts per query, even though the
+# API itself accepts up to 50 titles
+BATCH_SIZE = 20
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+def urllib_transport(url, headers, timeout):
+    """Perform a GET request and return (status, headers, body)
+
+    Any callable with this signature can be passed as a transport, e.g. one
+    pointing at a local stub server in tests.
+    """
+    try:
+        with urlopen(Request(url, headers=headers), timeout=timeout) as response:
+            return response.status, dict(response.headers), response.read()
+    except HTTPError as err:
+        # 304 Not Modified and API errors arrive as exceptions from urllib
+        return err.code, dict(err.headers or {}), b''
+
+class KeepAliveTransport:
+    """Transport that reuses one persistent HTTP connection per thread and host"""
+
+    def __init__(self):
+        self.local = threading.local()
+
+    def __call__(self, url, headers, timeout):
+        parts = urlsplit(url)
+        connections = self.local.__dict__.setdefault('connections', {})
+        key = (parts.scheme, parts.netloc)
+        conn = connections.get(key)
+        if conn is None:
+            conn_class = HTTPSConnection if parts.scheme == 'https' else HTTPConnection
+            conn = connections[key] = conn_class(parts.netloc, timeout=timeout)
+
+        path = parts.path or '/'
+        if parts.query:
+            path = f'{path}?{parts.query}'
+        try:
+            conn.request('GET', path, headers=headers)
+            response = conn.getresponse()
+            body = response.read()
+        except (OSError, HTTPException) as err:
+            conn.close()
+            del connections[key]
+            raise OSError(f'request to {parts.netloc} failed: {err}') from err
+        return response.status, dict(response.getheaders()), body
+
+def retry_delay(headers, attempt, backoff):
+    """Seconds to wait before retrying, honouring Retry-After when present"""
+    retry_after = {k.lower(): v for k, v in headers.items()}.get('retry-after')
+    if retry_after:
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            try:
+                return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+            except (TypeError, ValueError):
+                pass
+    return backoff * 2 ** attempt
+
+def with_retries(transport, retries=3, backoff=0.5, sleep=time.sleep):
+    """Wrap a transport to retry connection errors and 429/5xx with exponential backoff"""
+    def call(url, headers, timeout):
+        for attempt in range(retries + 1):
+            try:
+                status, response_headers, body = transport(url, headers, timeout)
+            except OSError:
+                if attempt == retries:
+                    raise
+                response_headers = {}
+            else:
+                if status not in RETRY_STATUSES or attempt == retries:
+                    return status, response_headers, body
+            sleep(retry_delay(response_headers, attempt, backoff))
+    return call
+
+def article_url(name):
+    """Link to the Wikipedia article for a specimen name"""
+    return f"https://en.wikipedia.org/wiki/{quote(name.replace(' ', '_'))}"
+
+def query_params(titles):
+    """MediaWiki query parameters for intro extracts and page images"""
+    return {
+        'action': 'query',
+        'format': 'json',
+        'prop': 'extracts|pageimages',
+        'exintro': 1,
+        'explaintext': 1,
+        'piprop': 'thumbnail|original',
+        'pithumbsize': 800,
+        'titles': '|'.join(titles),
+        'redirects': 1,
+    }
+
+def fallback_summary(name, desc):
+    """Summary built from the curated description when Wikipedia has nothing"""
+    return {'title': name, 'extract': desc, 'thumbnail': None, 'url': article_url(name)}
+
+def summary_from_page(name, desc, page):
+    """Turn one page object from the API response into a summary"""
+    if page is None or 'missing' in page or not page.get('extract'):
+        return fallback_summary(name, desc)
+    return {
+        'title': page['title'],
+        'extract': page['extract'],
+        'thumbnail': page.get('thumbnail'),
+        'url': article_url(name),
+    }
+
+def resolve_titles(query, titles):
+    """Map each requested title to its final title after normalization and redirects"""
+    normalized = {n['from']: n['to'] for n in query.get('normalized', [])}
+    redirects = {r['from']: r['to'] for r in query.get('redirects', [])}
+    resolved = {}
+    for title in titles:
+        final = normalized.get(title, title)
+        seen = {final}
+        while final in redirects:
+            final = redirects[final]
+            if final in seen:
+                break
+            seen.add(final)
+        resolved[title] = final
+    return resolved
+
+def fetch_batch(titles, transport=urllib_transport, timeout=10, if_modified_since=None):
+    """Fetch pages for up to BATCH_SIZE titles in one query, following continuations
+
+    Returns (pages, headers): a dict mapping each requested title to its
+    page object (None for titles the API did not return), and the first
+    response's headers with lowercase names. With if_modified_since, the
+    query is conditional and pages is None when the server answers 304 Not
+    Modified. Raises OSError or ValueError on failure.
+    """
+    params = query_params(titles)
+    params['exlimit'] = 'max'
+    params['pilimit'] = 'max'
+    pages_by_title = {}
+    resolved = {}
+    continuation = {}
+    headers = None
+    while True:
+        url = f"{API_URL}?{urlencode({**params, **continuation})}"
+        request_headers = {'User-Agent': USER_AGENT}
+        if if_modified_since and headers is None:
+            request_headers['If-Modified-Since'] = if_modified_since
+        status, response_headers, body = transport(url, request_headers, timeout)
+        if headers is None:
+            headers = {k.lower(): v for k, v in response_headers.items()}
+            if status == 304 and if_modified_since:
+                return None, headers
+        if status != 200:
+            raise OSError(f'HTTP {status} fetching batch of {len(titles)} titles')
+        data = json.loads(body)
+        if not isinstance(data, dict) or 'query' not in data:
+            # e.g. {"error": {"code": "maxlag", ...}}, which must not be cached
+            error = data.get('error', {}) if isinstance(data, dict) else {}
+            raise ValueError(f"API error fetching batch of {len(titles)} titles: {error.get('code', 'no query')}")
+        query = data['query']
+        if not resolved:
+            resolved = resolve_titles(query, titles)
+        for page in query.get('pages', {}).values():
+            merged = pages_by_title.setdefault(page['title'], {})
+            merged.update(page)
+        continuation = data.get('continue')
+        if not continuation:
+            break
+    return {title: pages_by_title.get(resolved.get(title, title)) for title in titles}, headers
+
+def fetch_summaries(specimens, cache=None, batch_size=BATCH_SIZE, max_workers=4,
+                    transport=None, timeout=10):
+    """Resolve summaries for many specimens in as few API requests as possible
+
+    specimens is an iterable of (name, desc) pairs. Fresh cache entries are
+    used as-is; everything else is fetched in batches of batch_size titles,
+    at most max_workers requests at a time over reused connections, with
+    retries. Expired entries are batched together, and a batch made only of
+    entries that recorded a Last-Modified is sent as a conditional request:
+    a 304 renews all of them at once. Batches that still fail fall back to
+    stale cache entries or the curated descriptions. Returns a dict mapping
+    name to summary.
+    """
+    if transport is None:
+        transport = with_retries(KeepAliveTransport())
+
+    results = {}
+    pending = []
+    for name, desc in dict(specimens).items():
+        summary = cache.fresh(name) if cache is not None else None
+        if summary is not None:
+            results[name] = summary
+        else:
+            pending.append((name, desc, cache.last_modified(name) if cache is not None else None))
+    # Revalidatable entries first, so that they fill whole batches
+    pending.sort(key=lambda item: item[2] is None)
+
+    batches = [pending[i:i + batch_size] for i in range(0, len(pending), batch_size)]
+
+    def run(batch):
+        try:
+            dates = [last_modified for _, _, last_modified in batch]
+            since = None if None in dates else min(dates, key=parsedate_to_datetime)
+            return fetch_batch([name for name, _, _ in batch], transport, timeout, since)
+        except (OSError, ValueError, TypeError):
+            return None
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for batch, fetched in zip(batches, pool.map(run, batches)):
+            for name, desc, _ in batch:
+                summary = None
+                if fetched is None:
+                    summary = cache.stale(name) if cache is not None else None
+                elif fetched[0] is None:
+                    summary = cache.renew(name)
+                else:
+                    pages, headers = fetched
+                    summary = summary_from_page(name, desc, pages[name])
+                    if cache is not None:
+                        cache.put(name, summary, headers.get('last-modified'))
+                results[name] = summary if summary is not None else fallback_summary(name, desc)
+    return results
+
+class SummaryCache:
+    """On-disk cache of Wikipedia summaries, one JSON file per title
+
+    Entries younger than ttl seconds are served without any request. Older
+    entries are fetched again in batches, conditionally when they recorded
+    the batch response's Last-Modified (see fetch_summaries), and are still
+    served (stale) if the network is down. Without any entry, the curated description is used. The cache
+    keeps at most max_entries files, evicting the least recently used; file
+    mtimes record recency so hits cost no writes.
+    """
+
+    def __init__(self, directory=CACHE_DIR, ttl=DEFAULT_TTL, max_entries=DEFAULT_MAX_ENTRIES, clock=time.time):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.clock = clock
+        self.hits = self.revalidated = self.fetched = self.offline = 0
+
+    def path(self, name):
+        """Cache file for a title: readable slug plus a hash to keep names unique"""
+        slug = re.sub(r'[^A-Za-z0-9]+', '_', name).strip('_').lower()
+        digest = hashlib.sha1(name.encode('utf-8')).hexdigest()[:10]
+        return os.path.join(self.directory, f'{slug}-{digest}.json')
+
+    def load(self, name):
+        """Return the cached entry for a title, or None"""
+        try:
+            with open(self.path(name), encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return entry if entry.get('name') == name else None
+
+    def store(self, name, entry):
+        """Atomically write an entry and evict old ones if over the size limit"""
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.path(name)
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(entry, f, sort_keys=True)
+        os.replace(tmp_path, path)
+        self.prune()
+
+    def touch(self, name):
+        """Mark an entry as recently used"""
+        try:
+            os.utime(self.path(name))
+        except OSError:
+            pass
+
+    def prune(self):
+        """Evict least recently used entries beyond max_entries"""
+        try:
+            names = [n for n in os.listdir(self.directory) if n.endswith('.json')]
+        except OSError:
+            return
+        if len(names) <= self.max_entries:
+            return
+        paths = [os.path.join(self.directory, n) for n in names]
+        paths.sort(key=os.path.getmtime)
+        for path in paths[:len(paths) - self.max_entries]:
+            os.remove(path)
+
+    def fresh(self, name):
+        """Return the cached summary if it is within the TTL, else None"""
+        entry = self.load(name)
+        if entry is None or self.clock() - entry['fetched_at'] >= self.ttl:
+            return None
+        self.hits += 1
+        self.touch(name)
+        return entry['summary']
+
+    def stale(self, name):
+        """Return the cached summary regardless of age, else None"""
+        entry = self.load(name)
+        if entry is None:
+            return None
+        self.offline += 1
+        return entry['summary']
+
+    def last_modified(self, name):
+        """Last-Modified recorded with the cached entry for a title, or None"""
+        entry = self.load(name)
+        return entry.get('last_modified') if entry is not None else None
+
+    def renew(self, name):
+        """Restart the TTL of an entry the server reported unchanged; returns its summary or None"""
+        entry = self.load(name)
+        if entry is None:
+            return None
+        self.revalidated += 1
+        entry['fetched_at'] = self.clock()
+        self.store(name, entry)
+        return entry['summary']
+
+    def put(self, name, summary, last_modified=None):
+        """Store a freshly fetched summary with the response's Last-Modified"""
+        self.fetched += 1
+        self.store(name, {
+            'name': name,
+            'fetched_at': self.clock(),
+            'last_modified': last_modified,
+            'summary': summary,
+        })